@@ -1,70 +1,104 @@
-import os
-import random
 import pandas as pd
-import streamlit as st
-
-# ─── Cached Data Loaders ────────────────────────────────────────────────────
-@st.cache_data
-def load_workout_data():
-    """Load the mega gym workout dataset."""
-    root = os.path.abspath(os.path.dirname(__file__))
-    path = os.path.join(root, "../data/processed/megaGymDataset.csv")
-    return pd.read_csv(path)
-
-@st.cache_data
-def load_exercises_data():
-    """Load the exercises dataset."""
-    root = os.path.abspath(os.path.dirname(__file__))
-    path = os.path.join(root, "../data/processed/exercises4.csv")
-    return pd.read_csv(path)
-
-@st.cache_data
-def load_tracker_data():
-    """Load the workout fitness tracker dataset."""
-    root = os.path.abspath(os.path.dirname(__file__))
-    path = os.path.join(root, "../data/processed/workout_fitness_tracker_data.csv")
-    return pd.read_csv(path)
-
-@st.cache_data
-def load_nutrition_data():
-    """Load and clean the nutrition dataset."""
-    root = os.path.abspath(os.path.dirname(__file__))
-    path = os.path.join(root, "../data/processed/products_w_ing.csv")
-    df = pd.read_csv(path)
-    # Clean protein and calories
-    if 'PROTEIN' in df.columns:
-        df['PROTEIN'] = df['PROTEIN'].astype(str).str.replace('g', '').astype(float, errors='ignore')
-        df['protein2'] = df['PROTEIN']
-    if 'CALORIES' in df.columns:
-        df['CALORIES'] = pd.to_numeric(df['CALORIES'], errors='coerce')
-    return df.dropna(subset=['CALORIES'])
+
+from analyses.cohort_stats import session_calories
+# Loaders live in analyses.loaders (no Streamlit); re-exported for existing callers
+from analyses.loaders import (
+    MEAL_COLUMNS,
+    load_cohort_stats,
+    load_exercises_data,
+    load_food_catalog,
+    load_food_neighbors,
+    load_meal_optimizer,
+    load_program_builder,
+    load_tracker_data,
+    load_workout_data,
+    load_workout_index,
+)
+from analyses.meal_optimizer import MEAL_SHARES, daily_targets
+from analyses.sampling import draw, plan_rng, selection_history
 
 # ─── Chatbot Helpers ─────────────────────────────────────────────────────────
-def get_workout_plan(body_parts=None, workout_type=None):
+ACTIVITY_FACTORS = {
+    'sedentary': 1.2,
+    'light': 1.375,
+    'moderate': 1.55,
+    'active': 1.725,
+    'very active': 1.9
+}
+
+# Share of calories from (protein, fat, carbs) that a meal should aim for
+MACRO_SPLITS = {
+    'muscle gain': (0.30, 0.25, 0.45),
+    'fat loss': (0.35, 0.30, 0.35),
+}
+DEFAULT_MACRO_SPLIT = (0.25, 0.30, 0.45)
+# A suggested meal is one of the day's meals (see meal_optimizer.MEAL_SHARES)
+# sized at their average share, and its calories stay within these
+# fractions of that share (widened if nothing fits)
+MEALS_PER_DAY = len(MEAL_SHARES)
+MEAL_CALORIE_WINDOWS = (0.15, 0.3, 0.5)
+
+def parse_body_parts(body_parts):
+    """Split "Chest and Biceps" into ["Chest", "Biceps"]."""
+    return [p.strip() for p in body_parts.split('and')] if body_parts else []
+
+def workout_record(sample):
+    """Shape one workout row into the plan dict shown in the app."""
+    return {
+        'title': sample.get('Title', ''),
+        'description': sample.get('Desc', ''),
+        'type': sample.get('Type', ''),
+        'body_part': sample.get('BodyPart', '')
+    }
+
+def workout_pools(body_parts=None, workout_type=None):
+    """Candidate row arrays of the workout index, one per requested body part."""
+    index = load_workout_index()
+    return [index.candidates(part, workout_type) for part in parse_body_parts(body_parts)]
+
+def draw_workouts(pools, user_id=None, seed=None):
+    """
+    One workout per non-empty pool (see `workout_pools`). Draws are seeded
+    by `user_id`/`seed` (see sampling.plan_rng) and skip workouts this
+    member was shown in their last few plans with other seeds when possible
+    (see sampling.SelectionHistory), so the same inputs give the same plan.
+    """
+    index = load_workout_index()
+    rng = plan_rng(user_id, seed)
+    avoid = selection_history.recent(user_id, 'workout', seed)
+    plans, picks = [], []
+    for rows in pools:
+        if len(rows):
+            row = int(draw(rng, rows, avoid=avoid | set(picks))[0])
+            picks.append(row)
+            plans.append(workout_record(index.row(row)))
+    selection_history.record(user_id, 'workout', picks, seed)
+    return plans or [{'message': 'No workouts found for those preferences.'}]
+
+def get_workout_plan(body_parts=None, workout_type=None, user_id=None, seed=None):
     """
     Fetch workout plans based on user's body part and workout type preferences.
     Returns a list of dicts with keys: title, description, type, body_part.
+
+    Draws are seeded by `user_id`/`seed` (see sampling.plan_rng) and skip
+    workouts this member was shown in their last few plans when possible.
     """
-    workout_data = load_workout_data()
-    print (workout_data["Type"].unique())
-    plans = []
-    if body_parts:
-        parts = [p.strip() for p in body_parts.split('and')]
-        for part in parts:
-            df = workout_data.copy()
-            if 'BodyPart' in df.columns:
-                df = df[df['BodyPart'].str.lower() == part.lower()]
-            if workout_type and 'Type' in df.columns:
-                df = df[df['Type'].str.lower() == workout_type.lower()]
-            if not df.empty:
-                sample = df.sample(1).iloc[0]
-                plans.append({
-                    'title': sample.get('Title', ''),
-                    'description': sample.get('Desc', ''),
-                    'type': sample.get('Type', ''),
-                    'body_part': sample.get('BodyPart', '')
-                })
-    return plans or [{'message': 'No workouts found for those preferences.'}]
+    return draw_workouts(workout_pools(body_parts, workout_type), user_id, seed)
+
+def get_weekly_program(days=4, exercises_per_day=6, difficulty=None, equipment=None, workout_type=None, seed=None):
+    """
+    Build a multi-day split with no muscle group on consecutive days.
+    `equipment` lists what the member has (None means a full gym).
+    Returns a dict with a `days` list (focus groups and exercises per day).
+    """
+    return load_program_builder().build(days, exercises_per_day, difficulty, equipment, workout_type, seed)
+
+def estimate_session_calories(workout_type, minutes=45, intensity=None):
+    """
+    Calories a `minutes`-long session of this workout type burns on average
+    in the tracker cohort (None when the cohort has no such workouts).
+    """
+    return session_calories(load_cohort_stats(), workout_type, minutes, intensity)
 
 
 def calculate_daily_calories(weight_lbs, height_in, age, gender, activity_level, bmi):
@@ -81,14 +115,7 @@ def calculate_daily_calories(weight_lbs, height_in, age, gender, activity_level,
         bmr = 88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age)
     else:
         bmr = 447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age)
-    factors = {
-        'sedentary': 1.2,
-        'light': 1.375,
-        'moderate': 1.55,
-        'active': 1.725,
-        'very active': 1.9
-    }
-    calories = bmr * factors.get(activity_level.lower(), 1.2)
+    calories = bmr * ACTIVITY_FACTORS.get(activity_level.lower(), 1.2)
     # Adjust by BMI
     if bmi > 25:
         calories *= 0.85
@@ -98,35 +125,93 @@ def calculate_daily_calories(weight_lbs, height_in, age, gender, activity_level,
 
 
 
-def get_meal_plan(calories_target, goal):
+def get_meal_plan(calories_target, goal, user_id=None, seed=None):
     """
-    Suggest a meal based on calorie target and goal (e.g., muscle gain, fat loss).
+    Suggest one meal for a daily calorie target and goal (e.g., muscle gain, fat loss).
     Returns a dict with meal details or a message.
+    Seeded and recency-aware like `get_workout_plan`.
+    """
+    min_protein = min_protein_for_goal(goal)
+    rows = meal_candidates(load_food_catalog(), calories_target, goal, min_protein)
+    return draw_meal(rows, calories_target, min_protein, user_id, seed)
+
+def draw_meal(rows, calories_target, min_protein, user_id=None, seed=None):
+    """
+    One meal from the candidate `rows` (see `meal_candidates`), seeded and
+    recency-aware like `draw_workouts`.
     """
-    df = load_nutrition_data()
+    if not len(rows):
+        return no_meal_message(calories_target, min_protein)
+    row = int(draw(plan_rng(user_id, seed), rows, avoid=selection_history.recent(user_id, 'meal', seed))[0])
+    selection_history.record(user_id, 'meal', [row], seed)
+    return meal_record(load_food_catalog(), row, calories_target, min_protein)
+
+def get_daily_meal_plan(calories_target, goal, time_budget=0.1):
+    """
+    Combine foods and serving sizes into a full day of eating that hits the
+    calorie target and the goal's macro split.
+    Returns a dict with items, totals, targets and a feasible flag.
+    """
+    protein, fat, carbs = MACRO_SPLITS.get(goal.lower(), DEFAULT_MACRO_SPLIT)
+    targets = daily_targets(calories_target, protein, fat, carbs)
+    # Never ask for less protein than every meal at the per-meal minimum
+    protein_lo, protein_hi = targets['protein']
+    protein_lo = max(protein_lo, MEALS_PER_DAY * min_protein_for_goal(goal))
+    targets['protein'] = (protein_lo, max(protein_hi, protein_lo))
+    return load_meal_optimizer().plan(targets, time_budget=time_budget)
+
+def min_protein_for_goal(goal):
+    """Minimum grams of protein per meal for a goal."""
     if goal.lower() == 'muscle gain':
-        min_protein = 25
+        return 25
     elif goal.lower() == 'fat loss':
-        min_protein = 20
-    else:
-        min_protein = 15
-    candidates = df[
-        (df['CALORIES'] >= calories_target - 200) &
-        (df['CALORIES'] <= calories_target + 200) &
-        (df.get('protein2', pd.Series()).fillna(0) >= min_protein)
-    ]
-    if not candidates.empty:
-        meal = candidates.sample(1).iloc[0]
-        return {
-            'name': meal.get('Name', ''),
-            'category': meal.get('Category', ''),
-            'calories': meal.get('CALORIES', 0),
-            'protein': meal.get('PROTEIN', 0),
-            'fat': meal.get('FAT', 0),
-            'target_calories': calories_target,
-            'min_protein': min_protein
-        }
-    return {'message': f'No meals found for target {calories_target} kcal and min protein {min_protein}g.'}
+        return 20
+    return 15
+
+def macro_target(calories_target, goal):
+    """Nutrient profile (kcal and grams) a meal for this goal should resemble."""
+    protein, fat, carbs = MACRO_SPLITS.get(goal.lower(), DEFAULT_MACRO_SPLIT)
+    return {
+        'Caloric Value': calories_target,
+        'Protein': max(calories_target * protein / 4, min_protein_for_goal(goal)),
+        'Fat': calories_target * fat / 9,
+        'Carbohydrates': calories_target * carbs / 4,
+    }
+
+def meal_candidates(catalog, calories_target, goal, min_protein, k=10):
+    """
+    Catalog rows of the k foods closest to one meal's share of the day
+    (`calories_target` / MEALS_PER_DAY, in the goal's macro split) among
+    those within a calorie window of that share and meeting the protein
+    minimum.
+    """
+    meal_calories = calories_target / MEALS_PER_DAY
+    target = macro_target(meal_calories, goal)
+    protein = catalog.column('Protein')
+    for window in MEAL_CALORIE_WINDOWS:
+        rows = catalog.range('Caloric Value', meal_calories * (1 - window), meal_calories * (1 + window))
+        rows = rows[protein[rows] >= min_protein]
+        if len(rows):
+            return load_food_neighbors().rank(target, rows, k)[0]
+    return rows
+
+def meal_record(catalog, row, calories_target, min_protein):
+    """Shape one catalog food into the meal dict shown in the app."""
+    food = catalog.record(row, ['Caloric Value', 'Protein', 'Fat', 'Carbohydrates'])
+    return {
+        'name': food['name'],
+        'category': f"Group {food['group']}",
+        'calories': food['Caloric Value'],
+        'protein': food['Protein'],
+        'fat': food['Fat'],
+        'carbs': food['Carbohydrates'],
+        'target_calories': round(calories_target / MEALS_PER_DAY),
+        'min_protein': min_protein
+    }
+
+def no_meal_message(calories_target, min_protein):
+    return {'message': f'No meals found near {round(calories_target / MEALS_PER_DAY)} kcal '
+                       f'with at least {min_protein}g protein.'}
 
 def calculate_bmi(weight_lbs, height_in):
     """
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from analyses.ai_chatbot import (
+    ACTIVITY_FACTORS,
+    draw_meal,
+    draw_workouts,
+    load_food_catalog,
+    min_protein_for_goal,
+    meal_candidates,
+    workout_pools,
+)
+
+# Columns expected in the profiles frame passed to `generate_plans`
+PROFILE_COLUMNS = ["weight_lbs", "height_in", "age", "gender", "activity_level", "goal", "body_parts", "workout_type"]
+# Optional member id column; draws are seeded and recency-aware per member
+USER_COLUMN = "user_id"
+NUMERIC_COLUMNS = ["weight_lbs", "height_in", "age"]
+
+
+def calculate_bmi_batch(weight_lbs, height_in):
+    """Vectorized `calculate_bmi` over arrays of pounds and inches."""
+    weight = np.asarray(weight_lbs, dtype=float) * 0.453592  # kg
+    h_m = np.asarray(height_in, dtype=float) * 2.54 / 100.0  # m
+    return weight / (h_m * h_m)
+
+
+def calculate_daily_calories_batch(weight_lbs, height_in, age, gender, activity_level, bmi):
+    """
+    Vectorized `calculate_daily_calories`: Harris-Benedict BMR, activity
+    factor and BMI adjustment for whole arrays of profiles at once.
+    """
+    weight = np.asarray(weight_lbs, dtype=float) * 0.453592  # kg
+    height = np.asarray(height_in, dtype=float) * 2.54       # cm
+    age = np.asarray(age, dtype=float)
+    bmi = np.asarray(bmi, dtype=float)
+
+    male = pd.Series(gender).astype(str).str.lower().to_numpy() == 'male'
+    bmr = np.where(
+        male,
+        88.362 + (13.397 * weight) + (4.799 * height) - (5.677 * age),
+        447.593 + (9.247 * weight) + (3.098 * height) - (4.330 * age),
+    )
+    factors = (pd.Series(activity_level).astype(str).str.lower()
+               .map(ACTIVITY_FACTORS).fillna(1.2).to_numpy())
+    calories = bmr * factors
+    # Adjust by BMI
+    calories = np.where(bmi > 25, calories * 0.85, np.where(bmi < 18.5, calories * 1.15, calories))
+    # Python's round() rounds half to even, and so does np.rint
+    return np.rint(calories).astype(int)
+
+
+def _assign_workouts(profiles, users, seed):
+    """
+    One workout list per profile. Candidate pools are looked up once per
+    preference group; each member's draw is the one `get_workout_plan`
+    makes for that member and seed.
+    """
+    plans = [None] * len(profiles)
+    groups = profiles.groupby(["body_parts", "workout_type"], sort=False, dropna=False).indices
+    for (body_parts, workout_type), members in groups.items():
+        body_parts = body_parts if isinstance(body_parts, str) else None
+        workout_type = workout_type if isinstance(workout_type, str) else None
+        pools = workout_pools(body_parts, workout_type)
+        for member in members:
+            plans[member] = draw_workouts(pools, users[member], seed)
+    return plans
+
+
+def _assign_meals(profiles, daily_calories, users, seed):
+    """
+    One meal per profile, running one similarity query per (calories, goal)
+    group; each member's draw is the one `get_meal_plan` makes.
+    """
+    catalog = load_food_catalog()
+    meals = [None] * len(profiles)
+    keys = pd.DataFrame({"calories": daily_calories, "goal": profiles["goal"].astype(str).str.lower().to_numpy()})
+    for (calories, goal), members in keys.groupby(["calories", "goal"], sort=False).indices.items():
+        calories = int(calories)
+        min_protein = min_protein_for_goal(goal)
+        rows = meal_candidates(catalog, calories, goal, min_protein)
+        for member in members:
+            meals[member] = draw_meal(rows, calories, min_protein, users[member], seed)
+    return meals
+
+
+def generate_plans(profiles, seed=None):
+    """
+    Compute BMI, daily calories, a workout plan and a meal for every row of
+    `profiles` (a DataFrame with PROFILE_COLUMNS and optionally USER_COLUMN).
+    A member gets the same plan as from `get_workout_plan` / `get_meal_plan`
+    with their user id and `seed`.
+
+    Returns a copy of `profiles` with bmi, daily_calories, workout_plan and
+    meal_plan columns added. Raises ValueError for missing columns and for
+    rows without a numeric weight, height or age.
+    """
+    profiles = pd.DataFrame(profiles).reset_index(drop=True)
+    missing = [c for c in PROFILE_COLUMNS if c not in profiles.columns]
+    if missing:
+        raise ValueError(f"profiles is missing columns: {missing}")
+    numbers = profiles[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    invalid = numbers.index[numbers.isna().any(axis=1)].tolist()
+    if invalid:
+        raise ValueError(f"profiles rows {invalid[:10]} lack a numeric {'/'.join(NUMERIC_COLUMNS)}")
+    users = (profiles[USER_COLUMN].astype(object).where(profiles[USER_COLUMN].notna(), None).tolist()
+             if USER_COLUMN in profiles else [None] * len(profiles))
+
+    bmi = calculate_bmi_batch(numbers["weight_lbs"], numbers["height_in"])
+    daily_calories = calculate_daily_calories_batch(
+        numbers["weight_lbs"], numbers["height_in"], numbers["age"],
+        profiles["gender"], profiles["activity_level"], bmi
+    )
+
+    result = profiles.copy()
+    result["bmi"] = bmi
+    result["daily_calories"] = daily_calories
+    result["workout_plan"] = _assign_workouts(profiles, users, seed)
+    result["meal_plan"] = _assign_meals(profiles, daily_calories, users, seed)
+    return result
@@ -0,0 +1,199 @@
+import os
+import uuid
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+TRACKER_PATH = os.path.join(BASE_DIR, "../data/processed/workout_fitness_tracker_data.csv")
+CACHE_DIR = os.path.join(BASE_DIR, "../data/cache")
+
+AGE_BINS = [0, 18, 25, 35, 45, 55, 65, np.inf]
+AGE_LABELS = ["<18", "18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# Fixed-width histograms make percentiles mergeable across chunks.
+# The tracker records both measures with one decimal place.
+HIST_STEP = 0.1
+VO2_RANGE = (0.0, 100.0)
+BODY_FAT_RANGE = (0.0, 70.0)
+
+# Mega gym / exercise labels -> the tracker's Workout Type and Intensity
+COHORT_WORKOUT_TYPES = {
+    "strength": "Strength", "powerlifting": "Strength", "strongman": "Strength",
+    "olympic weightlifting": "Strength", "plyometrics": "HIIT", "cardio": "Cardio",
+    "stretching": "Yoga",
+}
+LEVEL_INTENSITY = {0: "Low", 1: "Medium", 2: "High"}
+
+USECOLS = [
+    "Age", "Gender", "Workout Type", "Workout Intensity", "Workout Duration (mins)",
+    "Calories Burned", "VO2 Max", "Body Fat (%)", "Mood Before Workout", "Mood After Workout",
+]
+
+
+class _Histograms:
+    """Per-group fixed-bin histograms of one measure, grown as new groups appear."""
+
+    def __init__(self, lo, hi):
+        self.lo = lo
+        self.n_bins = int(round((hi - lo) / HIST_STEP)) + 1
+        self.groups = {}
+        self.counts = np.zeros((0, self.n_bins), dtype=np.int64)
+
+    def add(self, keys, values):
+        values = np.asarray(values, dtype=float)
+        ok = ~np.isnan(values)
+        keys, values = keys[ok], values[ok]
+        if not len(values):
+            return
+        codes, uniques = pd.factorize(keys)
+        group_ids = np.array([self.groups.setdefault(k, len(self.groups)) for k in uniques])
+        if len(self.groups) > len(self.counts):
+            grown = np.zeros((len(self.groups), self.n_bins), dtype=np.int64)
+            grown[:len(self.counts)] = self.counts
+            self.counts = grown
+        bins = np.clip(np.rint((values - self.lo) / HIST_STEP).astype(int), 0, self.n_bins - 1)
+        np.add.at(self.counts, (group_ids[codes], bins), 1)
+
+    def percentiles(self, names):
+        """One row per group with n and the PERCENTILES of the measure."""
+        columns = [*names, "n", *(f"p{p}" for p in PERCENTILES)]
+        rows = []
+        for key, gid in self.groups.items():
+            counts = self.counts[gid]
+            total = counts.sum()
+            cum = np.cumsum(counts)
+            row = dict(zip(names, key))
+            row["n"] = int(total)
+            for p in PERCENTILES:
+                b = np.searchsorted(cum, total * p / 100.0, side="left")
+                row[f"p{p}"] = round(self.lo + b * HIST_STEP, 1)
+            rows.append(row)
+        return pd.DataFrame(rows, columns=columns).sort_values(names).reset_index(drop=True)
+
+
+def _age_band(age):
+    """Age band label of each age; NaN for missing ages."""
+    return pd.cut(age, bins=AGE_BINS, labels=AGE_LABELS, right=False).astype(object)
+
+
+def summarize_tracker(path=TRACKER_PATH, chunksize=500_000):
+    """
+    Stream the tracker export in chunks and return a dict of summary tables:
+
+    - calorie_rates: calories burned per minute by Workout Type and Intensity
+    - vo2_percentiles / body_fat_percentiles: by age band and gender
+    - mood_transitions: counts and row-normalised probabilities of
+      Mood Before -> Mood After
+
+    Only running sums and fixed-bin histograms are kept between chunks, so
+    memory stays flat regardless of the file size.
+    """
+    rate_parts = []
+    mood_parts = []
+    vo2 = _Histograms(*VO2_RANGE)
+    body_fat = _Histograms(*BODY_FAT_RANGE)
+
+    for chunk in pd.read_csv(path, usecols=USECOLS, chunksize=chunksize):
+        minutes = pd.to_numeric(chunk["Workout Duration (mins)"], errors="coerce")
+        calories = pd.to_numeric(chunk["Calories Burned"], errors="coerce")
+        rate = calories / minutes.where(minutes > 0)
+        rates = pd.DataFrame({
+            "workout_type": chunk["Workout Type"],
+            "intensity": chunk["Workout Intensity"],
+            "calories": calories,
+            "minutes": minutes,
+            "rate": rate,
+            "rate_sq": rate * rate,
+        }).dropna()
+        rate_parts.append(
+            rates.groupby(["workout_type", "intensity"], observed=True)
+            .agg(n=("rate", "size"), calories=("calories", "sum"), minutes=("minutes", "sum"),
+                 rate_sum=("rate", "sum"), rate_sq_sum=("rate_sq", "sum"))
+        )
+
+        # Rows without an age or gender have no cohort to count in
+        band = _age_band(pd.to_numeric(chunk["Age"], errors="coerce"))
+        known = band.notna() & chunk["Gender"].notna()
+        keys = np.empty(int(known.sum()), dtype=object)
+        keys[:] = list(zip(band[known], chunk.loc[known, "Gender"].astype(str)))
+        vo2.add(keys, pd.to_numeric(chunk.loc[known, "VO2 Max"], errors="coerce"))
+        body_fat.add(keys, pd.to_numeric(chunk.loc[known, "Body Fat (%)"], errors="coerce"))
+
+        mood_parts.append(
+            chunk.groupby(["Mood Before Workout", "Mood After Workout"], observed=True).size()
+        )
+
+    # Combine the per-chunk partial aggregates
+    totals = pd.concat(rate_parts).groupby(level=[0, 1]).sum()
+    mean_rate = totals["rate_sum"] / totals["n"]
+    calorie_rates = pd.DataFrame({
+        "n": totals["n"],
+        "calories": totals["calories"],
+        "minutes": totals["minutes"],
+        "calories_per_min": totals["calories"] / totals["minutes"],
+        "mean_rate": mean_rate,
+        "std_rate": np.sqrt((totals["rate_sq_sum"] / totals["n"] - mean_rate ** 2).clip(lower=0)),
+    }).reset_index()
+
+    counts = pd.concat(mood_parts).groupby(level=[0, 1]).sum().unstack(fill_value=0)
+    counts.index.name, counts.columns.name = "mood_before", "mood_after"
+    mood_transitions = counts.stack().rename("n").reset_index()
+    mood_transitions["probability"] = (
+        mood_transitions["n"] / mood_transitions.groupby("mood_before")["n"].transform("sum")
+    )
+
+    return {
+        "calorie_rates": calorie_rates,
+        "vo2_percentiles": vo2.percentiles(["age_band", "gender"]),
+        "body_fat_percentiles": body_fat.percentiles(["age_band", "gender"]),
+        "mood_transitions": mood_transitions,
+    }
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def load_cohort_summary(path=TRACKER_PATH, cache_dir=CACHE_DIR, chunksize=500_000):
+    """
+    Summary tables for the tracker file, read from a cache that is rebuilt
+    whenever the source file's size or mtime changes.
+    """
+    cache_path = os.path.join(cache_dir, "cohort_summary.pkl")
+    signature = _source_signature(path)
+    if os.path.isfile(cache_path):
+        cached = pd.read_pickle(cache_path)
+        if cached.get("source") == signature:
+            return cached["tables"]
+
+    tables = summarize_tracker(path, chunksize=chunksize)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written aside and renamed, so other workers never read a partial file
+    tmp = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+    pd.to_pickle({"source": signature, "tables": tables}, tmp)
+    os.replace(tmp, cache_path)
+    return tables
+
+
+def calories_per_minute(summary, workout_type, intensity=None):
+    """
+    Cohort calories-per-minute for a workout type (and optionally intensity).
+    Mega gym types such as "Plyometrics" are mapped to the tracker's types.
+    Returns None when the cohort has no matching rows.
+    """
+    rates = summary["calorie_rates"]
+    workout_type = COHORT_WORKOUT_TYPES.get(str(workout_type).lower(), workout_type)
+    rows = rates[rates["workout_type"].str.lower() == str(workout_type).lower()]
+    if intensity is not None:
+        rows = rows[rows["intensity"].str.lower() == str(intensity).lower()]
+    if rows.empty:
+        return None
+    return float(rows["calories"].sum() / rows["minutes"].sum())
+
+
+def session_calories(summary, workout_type, minutes, intensity=None):
+    """Cohort estimate of kcal burned in `minutes` of a workout type, or None."""
+    rate = calories_per_minute(summary, workout_type, intensity)
+    return None if rate is None else round(rate * minutes)
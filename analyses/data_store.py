@@ -0,0 +1,203 @@
+import os
+import json
+import uuid
+import hashlib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+PROCESSED_DIR = os.path.join(BASE_DIR, "../data/processed")
+COLUMN_CACHE_DIR = os.path.join(BASE_DIR, "../data/cache/columns")
+
+FORMAT_VERSION = 1
+# Set by the shared-memory launcher (analyses/shared_data.py) for its workers
+SHARED_MANIFEST_ENV = "WORKOUT_SHARED_DATASETS"
+
+
+# ─── Encoding helpers ───────────────────────────────────────────────────────
+def encode_strings(values):
+    """
+    Pack an array of strings into one UTF-8 byte blob plus int64 offsets,
+    so they can be stored in plain .npy files without pickling.
+    """
+    encoded = [str(v).encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def decode_strings(blob, offsets):
+    """Inverse of `encode_strings`: an object array of str."""
+    raw = bytes(blob)
+    out = np.empty(len(offsets) - 1, dtype=object)
+    for i in range(len(out)):
+        out[i] = raw[offsets[i]:offsets[i + 1]].decode("utf-8")
+    return out
+
+
+def dictionary_encode(series):
+    """int32 codes (-1 for missing) and the distinct non-null values."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    return codes.astype(np.int32), np.asarray(uniques, dtype=object)
+
+
+def decode_column(codes, uniques, categorical):
+    """Rebuild a string column from codes, as a Categorical or object array."""
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=pd.Index(uniques, dtype=object))
+    values = np.empty(len(codes), dtype=object)
+    present = codes >= 0
+    values[present] = uniques[codes[present]]
+    values[~present] = np.nan
+    return values
+
+
+# ─── Cache files ────────────────────────────────────────────────────────────
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_dir_for(path):
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(PROCESSED_DIR))
+    slug = rel.replace(os.sep, "__").replace(" ", "_")
+    return os.path.join(COLUMN_CACHE_DIR, slug)
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format_version") == FORMAT_VERSION else None
+
+
+def _is_fresh(manifest, path, cache_dir):
+    """
+    Cheap size/mtime check first; if only the mtime moved (e.g. a fresh
+    checkout) compare content hashes and refresh the stored mtime.
+    """
+    if manifest is None:
+        return False
+    stat = os.stat(path)
+    source = manifest["source"]
+    if source["size"] != stat.st_size:
+        return False
+    if source["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    if source["sha1"] != _file_hash(path):
+        return False
+    source["mtime_ns"] = stat.st_mtime_ns
+    try:
+        _write_atomic(os.path.join(cache_dir, "manifest.json"), json.dumps(manifest))
+    except OSError:
+        pass
+    return True
+
+
+def build_column_cache(path):
+    """
+    Parse `path` once and write every column to .npy files next to a
+    manifest.json. Numeric columns are stored as-is; string columns are
+    dictionary-encoded (int32 codes + UTF-8 dictionary).
+    """
+    df = pd.read_csv(path)
+    cache_dir = _cache_dir_for(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(path)
+    # A per-build tag keeps a concurrent reader on the old files valid
+    tag = uuid.uuid4().hex[:8]
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        col = df[name]
+        stem = f"{tag}_{i}"
+        if pd.api.types.is_bool_dtype(col) or pd.api.types.is_numeric_dtype(col):
+            np.save(os.path.join(cache_dir, f"{stem}.npy"), col.to_numpy())
+            columns.append({"name": name, "kind": "numeric", "file": stem})
+        else:
+            codes, uniques = dictionary_encode(col)
+            blob, offsets = encode_strings(uniques)
+            np.save(os.path.join(cache_dir, f"{stem}.codes.npy"), codes)
+            np.save(os.path.join(cache_dir, f"{stem}.dict.npy"), blob)
+            np.save(os.path.join(cache_dir, f"{stem}.offsets.npy"), offsets)
+            columns.append({"name": name, "kind": "string", "file": stem})
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "source": {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": _file_hash(path)},
+        "n_rows": len(df),
+        "columns": columns,
+    }
+    _write_atomic(os.path.join(cache_dir, "manifest.json"), json.dumps(manifest))
+
+    # Drop files from earlier builds
+    for fname in os.listdir(cache_dir):
+        if fname.endswith(".npy") and not fname.startswith(tag):
+            try:
+                os.remove(os.path.join(cache_dir, fname))
+            except OSError:
+                pass
+    return manifest
+
+
+def load_columns(cache_dir, manifest, categorical=()):
+    """
+    Open a built cache: numeric columns memory-mapped, strings decoded to
+    the same dtype read_csv gives, or to Categoricals for the columns named
+    in `categorical`.
+    """
+    data = {}
+    for col in manifest["columns"]:
+        stem = os.path.join(cache_dir, col["file"])
+        if col["kind"] == "numeric":
+            data[col["name"]] = np.load(f"{stem}.npy", mmap_mode="r")
+        else:
+            codes = np.load(f"{stem}.codes.npy", mmap_mode="r")
+            uniques = decode_strings(np.load(f"{stem}.dict.npy"), np.load(f"{stem}.offsets.npy"))
+            data[col["name"]] = decode_column(np.asarray(codes), uniques, col["name"] in categorical)
+    return pd.DataFrame(data, copy=False)
+
+
+# ─── Public loader ──────────────────────────────────────────────────────────
+def load_dataset(name, categorical=()):
+    """
+    Load a CSV under data/processed (e.g. "megaGymDataset.csv") through the
+    typed column cache, rebuilding the cache when the source changes.
+    Falls back to a plain read_csv if the cache cannot be written.
+    Columns have read_csv's dtypes except those listed in `categorical`.
+
+    Under the shared-memory launcher (see analyses/shared_data.py) published
+    datasets are attached zero-copy instead.
+    """
+    path = name if os.path.isabs(name) else os.path.join(PROCESSED_DIR, name)
+    if os.environ.get(SHARED_MANIFEST_ENV):
+        from analyses.shared_data import attach_dataset
+        shared = attach_dataset(path)
+        if shared is not None:
+            return shared
+    cache_dir = _cache_dir_for(path)
+    manifest = _read_manifest(cache_dir)
+    if not _is_fresh(manifest, path, cache_dir):
+        try:
+            manifest = build_column_cache(path)
+        except OSError:
+            df = pd.read_csv(path)
+            return df.astype({c: "category" for c in categorical}) if categorical else df
+    try:
+        return load_columns(cache_dir, manifest, categorical)
+    except FileNotFoundError:
+        # Another process rebuilt the cache between our manifest read and load
+        return load_columns(cache_dir, _read_manifest(cache_dir), categorical)
@@ -0,0 +1,126 @@
+import re
+import weakref
+import numpy as np
+import pandas as pd
+
+from analyses.range_index import build_range_index
+
+# Splits "Bench, Barbell" / "Step or Box" / "None or Dumbbells" into tokens
+_SPLIT_RE = re.compile(r"\s*,\s*|\s+or\s+", flags=re.IGNORECASE)
+
+
+def tokenize(value):
+    """
+    Split one comma / "or" separated cell into lower-cased tokens.
+    Missing values give an empty list.
+    """
+    if not isinstance(value, str):
+        return []
+    return [tok.strip().lower() for tok in _SPLIT_RE.split(value) if tok.strip()]
+
+
+class TokenBitmask:
+    """
+    Packs the tokens of a text column into one bitset per row.
+
+    Each distinct token gets a bit; rows are stored as an (n_rows, n_words)
+    uint64 array so the vocabulary can grow past 64 tokens.
+    """
+
+    def __init__(self, values):
+        values = pd.Series(values)
+        # Tokenize each distinct cell once, then broadcast back to the rows
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        vocab = {}
+        cell_tokens = []
+        for cell in uniques:
+            toks = tokenize(cell)
+            for tok in toks:
+                vocab.setdefault(tok, len(vocab))
+            cell_tokens.append(toks)
+
+        self.vocab = vocab
+        self.n_words = max(1, (len(vocab) + 63) // 64)
+        cell_bits = np.zeros((len(uniques) + 1, self.n_words), dtype=np.uint64)
+        for i, toks in enumerate(cell_tokens):
+            for tok in toks:
+                bit = vocab[tok]
+                cell_bits[i, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        # The last row stays empty and is used for missing values (code -1)
+        self.bits = cell_bits[codes]
+        self._term_cache = {}
+
+    def __len__(self):
+        return len(self.bits)
+
+    def term_mask(self, term):
+        """
+        Bits of every vocabulary token containing `term` (case-insensitive).
+        Matches the substring semantics of the old `str.contains` filter.
+        """
+        term = str(term).strip().lower()
+        mask = self._term_cache.get(term)
+        if mask is None:
+            mask = np.zeros(self.n_words, dtype=np.uint64)
+            for tok, bit in self.vocab.items():
+                if term in tok:
+                    mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+            self._term_cache[term] = mask
+        return mask
+
+    def exact_mask(self, terms):
+        """Bits of the tokens exactly equal to any of `terms` (case-insensitive)."""
+        mask = np.zeros(self.n_words, dtype=np.uint64)
+        for term in terms:
+            bit = self.vocab.get(str(term).strip().lower())
+            if bit is not None:
+                mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return mask
+
+    def any_match(self, mask, rows=None):
+        """
+        Boolean array: True for rows sharing at least one bit with `mask`.
+        When `rows` is given only those row ids are tested.
+        """
+        bits = self.bits if rows is None else self.bits[rows]
+        return (bits & mask).any(axis=1)
+
+    def contains_any(self, terms, rows=None):
+        mask = np.zeros(self.n_words, dtype=np.uint64)
+        for term in terms:
+            mask |= self.term_mask(term)
+        return self.any_match(mask, rows)
+
+
+class ExerciseIndex:
+    """
+    One-time index over the exercises dataset used by `filter_data`.
+    Row positions in the index line up with the DataFrame it was built from,
+    which is expected not to be modified afterwards.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self._source = weakref.ref(df)
+        self.equipment = TokenBitmask(df["Equipment Needed"])
+        self.muscles = TokenBitmask(df["Target Muscle Group"])
+        self.difficulty = pd.Categorical(df["Difficulty Level"])
+        self.calories = build_range_index(df, "Burns Calories")
+
+    def __len__(self):
+        return self.n_rows
+
+    def built_for(self, df):
+        """True if this index was built over this very DataFrame object."""
+        return self._source() is df
+
+    def difficulty_mask(self, difficulty, rows=None):
+        codes = self.difficulty.codes if rows is None else self.difficulty.codes[rows]
+        if difficulty not in self.difficulty.categories:
+            return np.zeros(len(codes), dtype=bool)
+        return codes == self.difficulty.categories.get_loc(difficulty)
+
+
+def build_exercise_index(df):
+    """Build an ExerciseIndex for the given exercises DataFrame."""
+    return ExerciseIndex(df)
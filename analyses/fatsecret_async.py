@@ -0,0 +1,142 @@
+import asyncio
+import time
+
+import httpx
+
+from analyses.fatsecret_client import RETRY_STATUSES, FatSecretClient, parse_foods, parse_recipes
+from analyses.meal_optimizer import MEAL_SHARES
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFatSecretClient:
+    """
+    Non-blocking FatSecret client over one pooled `httpx.AsyncClient`.
+
+    Requests are signed by `client` (a FatSecretClient for the same
+    credentials) and sent on the event loop, bounded by a semaphore
+    (`max_concurrency`, also the connection pool size) and a token bucket
+    (`rate` per second), so fan-out lookups overlap instead of queueing
+    one after another. Responses in RETRY_STATUSES and connection errors
+    are retried with exponential backoff. Methods are awaited on the
+    caller's event loop (e.g. from an async FastAPI endpoint); one instance
+    should stay on one loop.
+    """
+
+    def __init__(self, client: FatSecretClient, max_concurrency=8, rate=10, burst=None,
+                 retries=3, backoff_factor=0.3):
+        self.client = client
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._max_concurrency = max_concurrency
+        self._rate = rate
+        self._burst = burst
+        self._semaphore = None
+        self._bucket = None
+        self._http = None
+
+    def _limits(self):
+        # Created lazily so they bind to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._bucket = TokenBucket(self._rate, self._burst)
+            timeout = self.client.timeout
+            connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(max_connections=self._max_concurrency),
+            )
+        return self._semaphore, self._bucket
+
+    async def _send(self, params):
+        url = self.client.base_url
+        for attempt in range(self.retries + 1):
+            # Signed per attempt: every request needs a fresh nonce
+            signed = self.client.signed_params("POST", url, params)
+            try:
+                resp = await self._http.post(url, data=signed)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    resp.raise_for_status()
+                    return resp.json()
+            await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+
+    async def server_api(self, method, **params):
+        """Call a `method=...` endpoint on server.api with format=json."""
+        semaphore, bucket = self._limits()
+        async with semaphore:
+            await bucket.acquire()
+            return await self._send({"method": method, "format": "json", **params})
+
+    async def search_foods(self, query, page_number=0, max_results=20):
+        body = await self.server_api("foods.search", search_expression=query,
+                                     page_number=page_number, max_results=max_results)
+        return parse_foods(body)[0]
+
+    async def search_recipes(self, cal_min, cal_max, max_results=5):
+        body = await self.server_api("recipes.search.v3", **{
+            "calories.from": cal_min, "calories.to": cal_max, "page_number": 0,
+            "max_results": max_results, "sort_by": "caloriesPerServingAscending",
+        })
+        return parse_recipes(body)
+
+    async def get_recipe(self, recipe_id):
+        body = await self.server_api("recipe.get.v2", recipe_id=recipe_id)
+        return body.get("recipe", {})
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = self._semaphore = self._bucket = None
+
+    async def search_many_foods(self, queries, max_results=20):
+        """foods.search for several queries at once -> {query: foods}."""
+        results = await asyncio.gather(*(self.search_foods(q, 0, max_results) for q in queries))
+        return dict(zip(queries, results))
+
+    async def meal_recipes(self, daily_calories, window=150, max_results=5, details=True):
+        """
+        Recipes for each meal's calorie window (see MEAL_SHARES), searched in
+        parallel; with `details`, every candidate's recipe.get is fetched in
+        parallel too and merged in under "details".
+        Returns {meal: [recipe, ...]}.
+        """
+        meals = list(MEAL_SHARES)
+        searches = []
+        for meal in meals:
+            centre = daily_calories * MEAL_SHARES[meal]
+            searches.append(self.search_recipes(max(int(centre - window), 0), int(centre + window), max_results))
+        found = await asyncio.gather(*searches, return_exceptions=True)
+
+        plan = {}
+        for meal, recipes in zip(meals, found):
+            plan[meal] = [] if isinstance(recipes, Exception) else recipes
+        if details:
+            candidates = [r for meal in meals for r in plan[meal]]
+            fetched = await asyncio.gather(*(self.get_recipe(r["id"]) for r in candidates), return_exceptions=True)
+            for recipe, info in zip(candidates, fetched):
+                recipe["details"] = None if isinstance(info, Exception) else info
+        return plan
@@ -0,0 +1,168 @@
+import time
+import uuid
+import hmac
+import hashlib
+import base64
+import threading
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SERVER_API_URL = "https://platform.fatsecret.com/rest/server.api"
+RECIPES_SEARCH_URL = "https://platform.fatsecret.com/rest/recipes/search/v3"
+
+DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+# Responses retried with exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def percent_encode(s) -> str:
+    """RFC3986 percent-encode."""
+    return urllib.parse.quote(str(s), safe='-._~')
+
+
+class FatSecretClient:
+    """
+    OAuth1 (HMAC-SHA1) FatSecret client over one pooled `requests.Session`.
+
+    Keep-alive connections are reused across calls, transient failures are
+    retried with exponential backoff, and the signing key plus the encoded
+    static OAuth parameters are computed once.
+    """
+
+    def __init__(self, consumer_key, consumer_secret, timeout=DEFAULT_TIMEOUT,
+                 retries=3, backoff_factor=0.3, pool_size=10, session=None, base_url=SERVER_API_URL):
+        self.consumer_key = consumer_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self._signing_key = (percent_encode(consumer_secret or "") + "&").encode("utf-8")
+        self._static_oauth = {
+            "oauth_consumer_key":     consumer_key or "",
+            "oauth_signature_method": "HMAC-SHA1",
+            "oauth_version":          "1.0",
+        }
+        self._static_pairs = [(percent_encode(k), percent_encode(v)) for k, v in self._static_oauth.items()]
+
+        self.session = session or requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST"}),
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # ─── Signing ────────────────────────────────────────────────────────────
+    def sign(self, http_method, url, params, oauth_dynamic):
+        """
+        Signature over the api params plus OAuth params: percent-encode and
+        sort every pair, build METHOD&url&params, HMAC-SHA1, base64.
+        """
+        pairs = list(self._static_pairs)
+        pairs.extend((percent_encode(k), percent_encode(v)) for k, v in params.items())
+        pairs.extend((percent_encode(k), percent_encode(v)) for k, v in oauth_dynamic.items())
+        pairs.sort()  # lexicographical on (key, value)
+        normalized = "&".join(f"{k}={v}" for k, v in pairs)
+        base_string = "&".join([http_method.upper(), percent_encode(url), percent_encode(normalized)])
+        digest = hmac.new(self._signing_key, base_string.encode("utf-8"), hashlib.sha1).digest()
+        return base64.b64encode(digest).decode()
+
+    def signed_params(self, http_method, url, params):
+        """api params + OAuth params including `oauth_signature`."""
+        params = {k: str(v) for k, v in params.items()}
+        oauth = {
+            "oauth_timestamp": str(int(time.time())),
+            "oauth_nonce":     uuid.uuid4().hex,
+        }
+        signature = self.sign(http_method, url, params, oauth)
+        return {**params, **self._static_oauth, **oauth, "oauth_signature": signature}
+
+    # ─── Requests ───────────────────────────────────────────────────────────
+    def request(self, http_method, url, params, timeout=None):
+        """Send a signed request and return the decoded JSON body."""
+        signed = self.signed_params(http_method, url, params)
+        if http_method.upper() == "GET":
+            resp = self.session.get(url, params=signed, timeout=timeout or self.timeout)
+        else:
+            resp = self.session.post(url, data=signed, timeout=timeout or self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def server_api(self, method, timeout=None, **params):
+        """Call a `method=...` endpoint on server.api with format=json."""
+        return self.request("POST", self.base_url, {"method": method, "format": "json", **params}, timeout)
+
+    def foods_search(self, query, page_number=0, max_results=20, timeout=None):
+        """foods.search -> (list of food dicts, total_results)."""
+        body = self.server_api("foods.search", timeout=timeout, search_expression=query,
+                               page_number=page_number, max_results=max_results)
+        return parse_foods(body)
+
+    def recipes_search(self, cal_min, cal_max, page_number=0, max_results=5, timeout=None):
+        """recipes.search.v3 over a calorie range -> (list of recipes, total_results)."""
+        body = self.server_api("recipes.search.v3", timeout=timeout, **{
+            "calories.from": cal_min, "calories.to": cal_max, "page_number": page_number,
+            "max_results": max_results, "sort_by": "caloriesPerServingAscending",
+        })
+        return parse_recipes(body), _total_results(body.get("recipes"))
+
+    def recipe_get(self, recipe_id, timeout=None):
+        """recipe.get.v2 -> the recipe dict."""
+        return self.server_api("recipe.get.v2", timeout=timeout, recipe_id=recipe_id).get("recipe", {})
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(consumer_key, consumer_secret):
+    """
+    Process-wide client for these credentials, so every caller using them
+    shares one connection pool.
+    """
+    with _clients_lock:
+        client = _clients.get((consumer_key, consumer_secret))
+        if client is None:
+            client = _clients[(consumer_key, consumer_secret)] = FatSecretClient(consumer_key, consumer_secret)
+        return client
+
+
+def parse_recipes(body):
+    """recipes.search JSON -> list of {"id", "name", "url"}."""
+    # FatSecret nests recipes under "recipes" → "recipe"
+    items = (body.get("recipes") or {}).get("recipe", [])
+    if isinstance(items, dict):
+        items = [items]
+    return [
+        {"id": r["recipe_id"], "name": r["recipe_name"], "url": r["recipe_url"]}
+        for r in items
+    ]
+
+
+def _total_results(section):
+    try:
+        return int((section or {}).get("total_results", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_foods(body):
+    """foods.search JSON -> (list of food dicts, total_results)."""
+    section = body.get("foods") or {}
+    items = section.get("food", [])
+    if isinstance(items, dict):
+        items = [items]
+    return items, _total_results(section)
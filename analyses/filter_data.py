@@ -1,41 +1,48 @@
 import os
+import numpy as np
 import pandas as pd
-import re
+
+from analyses.data_store import load_dataset
+from analyses.exercise_index import build_exercise_index
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 csv_path = os.path.join(BASE_DIR, "../data/processed/exercises_cleaned.csv")
 
-df = pd.read_csv(csv_path)
-df["Burns Calories"] = pd.to_numeric(df["Burns Calories"], errors="coerce")
-
-def filter_data(df, calories_min=0, calories_max=None, difficulty=None, equipment_include=None,equipment_exclude=None, muscle_group=None):
-    df = df[df["Burns Calories"] >= calories_min]
-    df = df[df["Burns Calories"] <= calories_max]
-    df = df[df["Difficulty Level"] == difficulty] if difficulty != "All" else df
-    # df = df[df["Equipment Needed"].str.contains(equipment_include, case=False, na=False)] if equipment_include != "None" else df
-    # if equipment_exclude is not None and equipment_exclude != "None":
-    #     mask = ~df["Equipment Needed"].str.contains("or", case=False, na=False)
-    #     df_filtered = df.loc[mask].copy()
-    #     df_filtered = df_filtered[~df_filtered["Equipment Needed"].str.contains(equipment_exclude, case=False, na=False)]
-    #     df.loc[mask] = df_filtered
+def load_exercises(path=csv_path):
+    """The cleaned exercises dataset with numeric calories (read on demand, not at import)."""
+    df = load_dataset(path)
+    # Left alone when already numeric, so a frame attached from shared memory is not copied
+    if not pd.api.types.is_numeric_dtype(df["Burns Calories"]):
+        df["Burns Calories"] = pd.to_numeric(df["Burns Calories"], errors="coerce")
+    return df
+
+def filter_data(df, calories_min=0, calories_max=None, difficulty=None, equipment_include=None,equipment_exclude=None, muscle_group=None, index=None):
+    """
+    Filter exercises by calories, difficulty, equipment and muscle group.
+
+    `index` is an ExerciseIndex built once over `df` (see
+    `build_exercise_index`); when omitted, or built over a different
+    frame, one is built for this call.
+    """
+    if index is None or not index.built_for(df):
+        index = build_exercise_index(df)
+
+    # Calorie range first: a binary search gives the candidate row ids
+    rows = index.calories.range(calories_min, calories_max)
+    if difficulty is not None and difficulty != "All":
+        rows = rows[index.difficulty_mask(difficulty, rows)]
+
+    # — Include filter (keep rows that mention any included item) —
     if equipment_include:
-        # build regex “Dumbbell|Barbell|…”
-        include_pattern = "|".join(re.escape(eq) for eq in equipment_include)
-        df = df[df["Equipment Needed"]
-                .str.contains(include_pattern, case=False, na=False)]
+        rows = rows[index.equipment.contains_any(equipment_include, rows)]
 
     # — Exclude filter (drop any row that mentions any excluded item) —
     if equipment_exclude:
-        exclude_pattern = "|".join(re.escape(eq) for eq in equipment_exclude)
-        df = df[~df["Equipment Needed"]
-                .str.contains(exclude_pattern, case=False, na=False)]
-    if muscle_group != "All":
-        if isinstance(muscle_group, list):
-            df = df[df["Target Muscle Group"].isin(muscle_group)]
-        else:
-            df = df[df["Target Muscle Group"] == str(muscle_group)]
-
-    
-    return df
-# print(f"Filtered data: {filter_data(df, calories_min=100, calories_max=1000, difficulty="Beginner", equipment_include="None", equipment_exclude="None", muscle_group="Back").head()}")
+        rows = rows[~index.equipment.contains_any(equipment_exclude, rows)]
+
+    if muscle_group is not None and muscle_group != "All":
+        groups = muscle_group if isinstance(muscle_group, list) else [muscle_group]
+        rows = rows[index.muscles.any_match(index.muscles.exact_mask(groups), rows)]
 
+    # Keep the original dataset order in the results
+    return df.iloc[np.sort(rows)]
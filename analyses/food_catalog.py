@@ -0,0 +1,165 @@
+import os
+import glob
+import re
+import numpy as np
+import pandas as pd
+
+from analyses.data_store import PROCESSED_DIR, load_dataset
+from analyses.range_index import SortedRangeIndex
+
+FOOD_DIR = os.path.join(PROCESSED_DIR, "FINAL FOOD DATASET")
+METADATA_PATH = os.path.join(FOOD_DIR, "METADATA", "Combined_FOOD_METADATA.csv")
+
+MACRO_COLUMNS = ["Caloric Value", "Protein", "Fat", "Carbohydrates", "Dietary Fiber"]
+
+
+def _normalize_name(name):
+    return " ".join(str(name).lower().split())
+
+
+class FoodCatalog:
+    """
+    All FOOD-DATA-GROUP files as one float32 nutrient matrix.
+
+    `matrix[i, j]` is nutrient `columns[j]` of food `names[i]` (per serving,
+    as in the source files) and `groups[i]` is the file group it came from.
+    `labels` is the frame of food names and groups (see `catalog_labels`);
+    neither it nor the matrix is copied, so both can be attached from
+    shared memory.
+    """
+
+    def __init__(self, labels, columns, matrix, metadata=None):
+        self.columns = list(columns)
+        self.column_index = {c: j for j, c in enumerate(self.columns)}
+        self.names = labels["food"].array
+        self.groups = labels["group"].to_numpy()
+        self.matrix = matrix
+        self.metadata = metadata
+
+        # First occurrence wins for foods listed in more than one group
+        self.name_index = {}
+        for i, name in enumerate(self.names):
+            self.name_index.setdefault(_normalize_name(name), i)
+        self._range_indexes = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def column(self, name):
+        """One nutrient column as a float32 array (a view into the matrix)."""
+        return self.matrix[:, self.column_index[name]]
+
+    def find(self, name):
+        """Row of a food by exact (case/space-insensitive) name, or None."""
+        return self.name_index.get(_normalize_name(name))
+
+    def search(self, text, limit=20):
+        """Rows whose name contains `text`, names starting with it first."""
+        text = _normalize_name(text)
+        if not text:
+            return []
+        prefix, contains = [], []
+        for name, i in self.name_index.items():
+            if name.startswith(text):
+                prefix.append(i)
+            elif text in name:
+                contains.append(i)
+        return (prefix + contains)[:limit]
+
+    def range(self, column, lo=None, hi=None):
+        """Rows with lo <= column <= hi, through a per-column sorted index."""
+        index = self._range_indexes.get(column)
+        if index is None:
+            index = self._range_indexes[column] = SortedRangeIndex(self.column(column))
+        return index.range(lo, hi)
+
+    def record(self, row, columns=None):
+        """A food as a dict: name, group and the requested nutrient values."""
+        columns = columns or self.columns
+        values = self.matrix[row]
+        out = {"name": self.names[row], "group": int(self.groups[row])}
+        out.update({c: round(float(values[self.column_index[c]]), 3) for c in columns})
+        return out
+
+    def nutrients(self, rows=None, columns=None):
+        """DataFrame of nutrient values for the given rows (default: all)."""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=int)
+        columns = columns or self.columns
+        data = self.matrix[np.ix_(rows, [self.column_index[c] for c in columns])]
+        frame = pd.DataFrame(data, columns=columns)
+        frame.insert(0, "group", self.groups[rows])
+        frame.insert(0, "food", self.names[rows])
+        return frame
+
+    def lookup(self, name, columns=None):
+        """Nutrients of one food by name, or None if it is not in the catalog."""
+        row = self.find(name)
+        return None if row is None else self.record(row, columns)
+
+
+def _group_number(path):
+    match = re.search(r"GROUP(\d+)", os.path.basename(path))
+    return int(match.group(1)) if match else 0
+
+
+def load_food_metadata(path=METADATA_PATH):
+    """Per-group mean/median of the main nutrients, without the file path columns."""
+    if not os.path.isfile(path):
+        return None
+    meta = load_dataset(path)
+    meta = meta.rename(columns={"Unnamed: 0": "nutrient"})
+    return meta[[c for c in ["nutrient", "Mean", "Median", "Group"] if c in meta.columns]]
+
+
+def _group_paths(food_dir):
+    return sorted(glob.glob(os.path.join(food_dir, "FOOD-DATA-GROUP*.csv")), key=_group_number)
+
+
+def catalog_columns(food_dir=FOOD_DIR):
+    """The nutrient columns of the group files, in file order (read from a header)."""
+    paths = _group_paths(food_dir)
+    if not paths:
+        return []
+    header = pd.read_csv(paths[0], nrows=0).columns
+    # The group files carry two copies of the old row index
+    return [c for c in header if c != "food" and not str(c).startswith("Unnamed")]
+
+
+def catalog_frame(food_dir=FOOD_DIR):
+    """
+    Every FOOD-DATA-GROUP*.csv under `food_dir` as one frame: food name,
+    group number, then the `catalog_columns` nutrients as float32.
+    """
+    columns = catalog_columns(food_dir)
+    parts = []
+    for path in _group_paths(food_dir):
+        df = load_dataset(path)
+        part = df[columns].apply(pd.to_numeric, errors="coerce").astype(np.float32)
+        part.insert(0, "group", np.full(len(df), _group_number(path), dtype=np.int8))
+        part.insert(0, "food", df["food"].astype(str))
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame({"food": pd.Series(dtype=str), "group": pd.Series(dtype=np.int8)})
+    return pd.concat(parts, ignore_index=True)
+
+
+def catalog_labels(frame):
+    """The food and group columns of a `catalog_frame`."""
+    return frame[["food", "group"]]
+
+
+def nutrient_matrix(frame, columns):
+    """The (foods x nutrients) float32 matrix of a `catalog_frame`, C-ordered."""
+    return np.ascontiguousarray(frame[columns].to_numpy(dtype=np.float32))
+
+
+def build_food_catalog(food_dir=FOOD_DIR, labels=None, matrix=None):
+    """
+    A FoodCatalog over every FOOD-DATA-GROUP*.csv under `food_dir`, or over
+    the given `labels` and `matrix` (e.g. ones attached from shared memory).
+    """
+    columns = catalog_columns(food_dir)
+    if labels is None or matrix is None:
+        frame = catalog_frame(food_dir)
+        labels, matrix = catalog_labels(frame), nutrient_matrix(frame, columns)
+    return FoodCatalog(labels, columns, matrix, metadata=load_food_metadata())
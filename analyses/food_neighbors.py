@@ -0,0 +1,93 @@
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from analyses.food_catalog import MACRO_COLUMNS
+
+
+def nutrient_scale(catalog, columns=MACRO_COLUMNS):
+    """Standard deviation of each nutrient column (missing values as 0), 1 where it is 0."""
+    scale = np.array([np.nan_to_num(catalog.column(c).astype(np.float64), nan=0.0).std() for c in columns])
+    return np.where(scale > 0, scale, 1.0)
+
+
+def scaled_points(catalog, columns=MACRO_COLUMNS):
+    """The KD-tree's points: nutrient columns (missing values as 0) divided by `nutrient_scale`."""
+    X = np.column_stack([catalog.column(c) for c in columns]).astype(np.float64)
+    return np.nan_to_num(X, nan=0.0) / nutrient_scale(catalog, columns)
+
+
+class NutrientNeighbors:
+    """
+    KD-tree over a FoodCatalog's nutrient columns, each scaled by its
+    standard deviation so calories do not drown out grams of protein.
+    """
+
+    def __init__(self, catalog, columns=MACRO_COLUMNS, points=None):
+        self.catalog = catalog
+        self.columns = list(columns)
+        self.scale = nutrient_scale(catalog, self.columns)
+        # `points` (from `scaled_points`, e.g. attached from shared memory)
+        # is used as is; the tree reads a float64 C-ordered array in place
+        self.points = scaled_points(catalog, self.columns) if points is None else points
+        self.tree = KDTree(self.points)
+
+    def _target(self, target):
+        unknown = [c for c in target if c not in self.columns]
+        if unknown:
+            raise KeyError(f"Not an indexed nutrient: {unknown}")
+        dims = [j for j, c in enumerate(self.columns) if c in target]
+        values = np.array([target[self.columns[j]] for j in dims], dtype=np.float64)
+        return dims, values / self.scale[dims]
+
+    def query(self, target, k=5):
+        """
+        Rows of the k foods closest to `target` (a dict of nutrient -> amount
+        per serving) and their scaled distances, nearest first.
+
+        A target naming every indexed nutrient goes through the KD-tree;
+        a partial one is compared on just those nutrients.
+        """
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.empty(0, dtype=int), np.empty(0)
+        dims, point = self._target(target)
+        if len(dims) == len(self.columns):
+            dist, rows = self.tree.query(point.reshape(1, -1), k=k)
+            return rows[0], dist[0]
+        # Partial targets: vectorized distance over the named dimensions only
+        dist = np.sqrt(((self.points[:, dims] - point) ** 2).sum(axis=1))
+        rows = np.argpartition(dist, k - 1)[:k]
+        rows = rows[np.argsort(dist[rows], kind="stable")]
+        return rows, dist[rows]
+
+    def rank(self, target, rows, k=5):
+        """
+        The k of the given candidate `rows` closest to `target`, nearest
+        first, with their distances. For pre-filtered pools (e.g. a calorie
+        window) where a tree query over every food would mostly miss.
+        """
+        rows = np.asarray(rows, dtype=int)
+        if not len(rows) or k <= 0:
+            return rows[:0], np.empty(0)
+        dims, point = self._target(target)
+        dist = np.sqrt(((self.points[np.ix_(rows, dims)] - point) ** 2).sum(axis=1))
+        k = min(k, len(rows))
+        best = np.argpartition(dist, k - 1)[:k]
+        best = best[np.argsort(dist[best], kind="stable")]
+        return rows[best], dist[best]
+
+    def nearest_foods(self, target, k=5, columns=None):
+        """Like `query` but returns catalog records with a `distance` field."""
+        rows, dist = self.query(target, k)
+        columns = columns or self.columns
+        out = []
+        for row, d in zip(rows, dist):
+            food = self.catalog.record(row, columns)
+            food["distance"] = round(float(d), 4)
+            out.append(food)
+        return out
+
+
+def build_food_neighbors(catalog, columns=MACRO_COLUMNS, points=None):
+    """Build a NutrientNeighbors index over `catalog` (on precomputed `points` if given)."""
+    return NutrientNeighbors(catalog, columns, points)
@@ -0,0 +1,159 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+FOOD_STORE_PATH = os.path.join(BASE_DIR, "../data/cache/foods.db")
+
+class LocalFoodStore:
+    """
+    SQLite snapshot of every food fetched from FatSecret, so searches can be
+    answered offline. Names are indexed with FTS5 (word-prefix matching)
+    when SQLite has it, otherwise through a lower-cased name index.
+    """
+
+    def __init__(self, path=FOOD_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS foods (
+                    food_id     TEXT PRIMARY KEY,
+                    name        TEXT NOT NULL,
+                    name_key    TEXT NOT NULL,
+                    brand       TEXT,
+                    url         TEXT,
+                    description TEXT,
+                    serving     TEXT,
+                    calories    REAL,
+                    fat         REAL,
+                    carbs       REAL,
+                    protein     REAL,
+                    fetched_at  REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS foods_name_key ON foods(name_key)")
+        try:
+            with conn:
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS foods_fts USING fts5("
+                             "name, content='foods', content_rowid='rowid')")
+                # Keep the full-text index in step with the table
+                conn.execute("""CREATE TRIGGER IF NOT EXISTS foods_ai AFTER INSERT ON foods BEGIN
+                    INSERT INTO foods_fts(rowid, name) VALUES (new.rowid, new.name); END""")
+                conn.execute("""CREATE TRIGGER IF NOT EXISTS foods_ad AFTER DELETE ON foods BEGIN
+                    INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.rowid, old.name); END""")
+                conn.execute("""CREATE TRIGGER IF NOT EXISTS foods_au AFTER UPDATE ON foods BEGIN
+                    INSERT INTO foods_fts(foods_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+                    INSERT INTO foods_fts(rowid, name) VALUES (new.rowid, new.name); END""")
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+
+    def _connect(self):
+        # One connection per thread (prefetch and fallback run on worker threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def add_foods(self, foods):
+        """Upsert parsed food records (see nutrition_search.parse_foods); returns how many were written."""
+        now = time.time()
+        rows = []
+        for food in foods:
+            name = food.get("food_name")
+            if not name:
+                continue
+            rows.append((
+                str(food.get("food_id") or name), name, " ".join(name.lower().split()),
+                food.get("brand_name"), food.get("food_url"), food.get("food_description"), food.get("serving"),
+                food.get("calories"), food.get("fat"), food.get("carbs"), food.get("protein"), now,
+            ))
+        if rows:
+            with self._connect() as conn:
+                conn.executemany("""
+                    INSERT INTO foods (food_id, name, name_key, brand, url, description, serving,
+                                       calories, fat, carbs, protein, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(food_id) DO UPDATE SET
+                        name=excluded.name, name_key=excluded.name_key, brand=excluded.brand,
+                        url=excluded.url, description=excluded.description, serving=excluded.serving,
+                        calories=excluded.calories, fat=excluded.fat, carbs=excluded.carbs,
+                        protein=excluded.protein, fetched_at=excluded.fetched_at""", rows)
+        return len(rows)
+
+    def search(self, query, limit=20):
+        """Stored foods matching `query`, as food records."""
+        key = " ".join(str(query).lower().split())
+        if not key:
+            return []
+        conn = self._connect()
+        rows = []
+        if self.has_fts:
+            words = re.findall(r"\w+", key)
+            if words:
+                match = " ".join(f'"{w}"*' for w in words)
+                rows = conn.execute("""
+                    SELECT foods.* FROM foods_fts JOIN foods ON foods.rowid = foods_fts.rowid
+                    WHERE foods_fts MATCH ? ORDER BY (foods.name_key >= ? AND foods.name_key < ?) DESC, rank
+                    LIMIT ?""", (match, key, key + "￿", limit)).fetchall()
+        else:
+            rows = conn.execute("""
+                SELECT * FROM foods WHERE name_key >= ? AND name_key < ?
+                UNION ALL
+                SELECT * FROM foods WHERE name_key LIKE ? AND NOT (name_key >= ? AND name_key < ?)
+                LIMIT ?""", (key, key + "￿", f"%{key}%", key, key + "￿", limit)).fetchall()
+        return [self._food(r) for r in rows]
+
+    @staticmethod
+    def _food(row):
+        return {
+            "food_id": row["food_id"],
+            "food_name": row["name"],
+            "food_url": row["url"],
+            "brand_name": row["brand"],
+            "food_description": row["description"],
+            "serving": row["serving"],
+            "calories": row["calories"],
+            "fat": row["fat"],
+            "carbs": row["carbs"],
+            "protein": row["protein"],
+            "source": "local",
+        }
+
+    def __len__(self):
+        (n,) = self._connect().execute("SELECT COUNT(*) FROM foods").fetchone()
+        return n
+
+
+def _number(value):
+    return None if value is None or value != value else value  # NaN -> None
+
+
+def catalog_foods(catalog, query, limit=20):
+    """FINAL FOOD DATASET matches for `query`, as food records."""
+    foods = []
+    for row in catalog.search(query, limit):
+        food = catalog.record(row, ["Caloric Value", "Fat", "Carbohydrates", "Protein"])
+        foods.append({
+            "food_id": f"catalog-{row}",
+            "food_name": food["name"],
+            "food_url": None,
+            "brand_name": None,
+            "food_description": None,
+            "serving": "Per serving",
+            "calories": _number(food["Caloric Value"]),
+            "fat": _number(food["Fat"]),
+            "carbs": _number(food["Carbohydrates"]),
+            "protein": _number(food["Protein"]),
+            "source": "catalog",
+        })
+    return foods
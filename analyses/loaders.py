@@ -0,0 +1,148 @@
+import threading
+from functools import lru_cache, wraps
+
+from analyses.cohort_stats import LEVEL_INTENSITY, calories_per_minute, load_cohort_summary
+from analyses.data_store import load_dataset
+from analyses.exercise_index import build_exercise_index
+from analyses.filter_data import csv_path as EXERCISES_PATH, load_exercises as read_exercises
+from analyses.food_catalog import build_food_catalog, catalog_columns, catalog_frame, catalog_labels, nutrient_matrix
+from analyses.meal_optimizer import build_meal_optimizer, meal_macros
+from analyses.program_builder import ProgramBuilder, program_pool
+from analyses.shared_data import shared_array, shared_frame
+from analyses.workout_index import build_workout_index
+
+# Datasets and the structures built over them, loaded once per process and
+# shared by the Streamlit app, the API and batch jobs. Nothing here imports
+# Streamlit. Results are shared, not copied: callers must not modify them.
+
+# Nutrients compared when matching a meal to a target profile
+MEAL_COLUMNS = ['Caloric Value', 'Protein', 'Fat', 'Carbohydrates']
+
+# Low-cardinality label columns loaded as Categoricals (a small code per row
+# instead of a Python string each)
+CATEGORICAL_COLUMNS = {
+    "megaGymDataset.csv": ["Type", "BodyPart", "Level", "Equipment"],
+    "workout_fitness_tracker_data.csv": ["Gender", "Workout Type", "Workout Intensity"],
+}
+
+# Loaders call each other, so one re-entrant lock serializes first loads
+_load_lock = threading.RLock()
+_loaders = []
+
+
+def process_cache(fn):
+    """Memoize a loader for the life of the process; concurrent first calls build it once."""
+    cached = lru_cache(maxsize=None)(fn)
+
+    @wraps(fn)
+    def wrapper():
+        with _load_lock:
+            return cached()
+    wrapper.cache_clear = cached.cache_clear
+    _loaders.append(wrapper)
+    return wrapper
+
+
+def clear_process_caches():
+    """
+    Drop every loaded dataset and structure so the next calls reload them
+    from disk (e.g. after the source files changed). Workers attached to
+    shared memory (analyses/shared_data.py) get the published copies again
+    until they are relaunched.
+    """
+    with _load_lock:
+        for loader in _loaders:
+            loader.cache_clear()
+
+
+# ─── Datasets ───────────────────────────────────────────────────────────────
+@process_cache
+def load_workout_data():
+    """The mega gym workout dataset."""
+    return load_dataset("megaGymDataset.csv", CATEGORICAL_COLUMNS["megaGymDataset.csv"])
+
+@process_cache
+def load_exercises_data():
+    """The exercises dataset."""
+    return load_dataset("exercises4.csv")
+
+@process_cache
+def load_tracker_data():
+    """The workout fitness tracker dataset."""
+    name = "workout_fitness_tracker_data.csv"
+    return load_dataset(name, CATEGORICAL_COLUMNS[name])
+
+@process_cache
+def load_exercises():
+    """The cleaned exercises dataset with numeric calories (see filter_data.load_exercises)."""
+    return read_exercises(EXERCISES_PATH)
+
+# ─── Derived structures ─────────────────────────────────────────────────────
+@process_cache
+def load_exercise_index():
+    """Equipment / muscle-group index over `load_exercises()`."""
+    return build_exercise_index(load_exercises())
+
+@process_cache
+def load_workout_index():
+    """The workout dataset partitioned by (body part, type)."""
+    return build_workout_index(load_workout_data())
+
+@process_cache
+def load_cohort_stats():
+    """Cohort summary tables over the tracker dataset (see analyses.cohort_stats)."""
+    return load_cohort_summary()
+
+@process_cache
+def load_program_builder():
+    """Per-muscle candidate pools over exercises_cleaned and megaGym."""
+    return ProgramBuilder(shared_frame("program_pool", _program_pool))
+
+@process_cache
+def load_food_catalog():
+    """Nutrient matrix over the FINAL FOOD DATASET group files."""
+    # Both parts are published together; without them the catalog is read once here
+    labels = shared_frame("food_catalog", lambda: None)
+    matrix = shared_array("food_nutrients", lambda: None)
+    return build_food_catalog(labels=labels, matrix=matrix)
+
+@process_cache
+def load_food_neighbors():
+    """KD-tree over the catalog's meal macros for similarity search."""
+    # Imported here so pages that never rank foods do not load sklearn
+    from analyses.food_neighbors import build_food_neighbors
+    points = shared_array("food_neighbor_points", _neighbor_points)
+    return build_food_neighbors(load_food_catalog(), MEAL_COLUMNS, points)
+
+@process_cache
+def load_meal_optimizer():
+    """Daily meal-plan solver over the food catalog."""
+    macros = shared_array("meal_macros", _meal_macros)
+    return build_meal_optimizer(load_food_catalog(), load_food_neighbors(), macros)
+
+# ─── Shared-memory builds ───────────────────────────────────────────────────
+def _program_pool():
+    cohort = load_cohort_stats()
+    def calorie_rate(workout_type, level):
+        return calories_per_minute(cohort, workout_type, LEVEL_INTENSITY.get(level))
+    return program_pool(load_dataset("exercises_cleaned.csv"), load_workout_data(), calorie_rate)
+
+def _food_labels():
+    return catalog_labels(catalog_frame())
+
+def _food_nutrients():
+    return nutrient_matrix(catalog_frame(), catalog_columns())
+
+def _meal_macros():
+    return meal_macros(load_food_catalog())
+
+def _neighbor_points():
+    from analyses.food_neighbors import scaled_points
+    return scaled_points(load_food_catalog(), MEAL_COLUMNS)
+
+# Built once by the shared-memory launcher (analyses/shared_data.py) and
+# attached by its workers; elsewhere the loaders above build them locally
+SHARED_FRAMES = {"food_catalog": _food_labels, "program_pool": _program_pool}
+SHARED_ARRAYS = {
+    "food_nutrients": _food_nutrients, "food_neighbor_points": _neighbor_points, "meal_macros": _meal_macros,
+}
@@ -0,0 +1,273 @@
+import time
+import numpy as np
+
+# Serving multipliers the solver may choose for a food
+PORTIONS = np.array([0.5, 1.0, 1.5, 2.0])
+MAX_ITEMS = 6
+CALORIE_TOLERANCE = 0.05  # accept plans within ±5% of the calorie target
+POOL_SIZE = 150
+# Escalation when no plan meets the targets: a wider candidate pool first,
+# then bounds loosened by `slack` (a share of the calorie target)
+RELAXATION_STEPS = [
+    {'pool_size': POOL_SIZE, 'slack': 0.0},
+    {'pool_size': 3 * POOL_SIZE, 'slack': 0.0},
+    {'pool_size': 3 * POOL_SIZE, 'slack': 0.05},
+    {'pool_size': 3 * POOL_SIZE, 'slack': 0.10},
+]
+
+# The day's meals and the share of the daily calories each one gets
+MEAL_SHARES = {"breakfast": 0.25, "lunch": 0.40, "dinner": 0.35}
+
+# Macro columns used by the solver, in this order
+COLUMNS = ['Caloric Value', 'Protein', 'Fat', 'Carbohydrates']
+KCAL, PROTEIN, FAT, CARBS = range(4)
+
+
+def daily_targets(calories_target, protein_share, fat_share, carb_share):
+    """
+    Daily bounds for a calorie target and macro split (shares of kcal):
+    protein gets a band from its share upward, fat and carbs a band around
+    their share.
+    """
+    return {
+        'calories': float(calories_target),
+        'protein': (calories_target * protein_share / 4, calories_target * (protein_share + 0.10) / 4),
+        'fat': (calories_target * max(fat_share - 0.05, 0) / 9, calories_target * (fat_share + 0.05) / 9),
+        'carbs': (calories_target * max(carb_share - 0.10, 0) / 4, calories_target * (carb_share + 0.10) / 4),
+    }
+
+
+def relax_targets(targets, slack):
+    """
+    `targets` with every bound loosened by `slack` x the calorie target:
+    wider protein/fat/carb bands and calorie tolerance.
+    """
+    if not slack:
+        return targets
+    kcal = targets['calories']
+    protein_lo, protein_hi = targets['protein']
+    fat_lo, fat_hi = targets['fat']
+    carb_lo, carb_hi = targets['carbs']
+    return {
+        **targets,
+        'protein': (max(protein_lo - kcal * slack / 4, 0), protein_hi + kcal * slack / 4),
+        'fat': (max(fat_lo - kcal * slack / 9, 0), fat_hi + kcal * slack / 9),
+        'carbs': (max(carb_lo - kcal * slack / 4, 0), carb_hi + kcal * slack / 4),
+        'tolerance': targets.get('tolerance', CALORIE_TOLERANCE) + slack,
+    }
+
+
+def missed_targets(totals, targets):
+    """Names of the bounds ('calories', 'protein', 'fat', 'carbs') `totals` misses."""
+    kcal = targets['calories']
+    missed = []
+    if abs(totals[KCAL] - kcal) > targets.get('tolerance', CALORIE_TOLERANCE) * kcal:
+        missed.append('calories')
+    if not targets['protein'][0] <= totals[PROTEIN] <= targets['protein'][1]:
+        missed.append('protein')
+    if not targets['fat'][0] <= totals[FAT] <= targets['fat'][1]:
+        missed.append('fat')
+    if not targets['carbs'][0] <= totals[CARBS] <= targets['carbs'][1]:
+        missed.append('carbs')
+    return missed
+
+
+def meal_macros(catalog):
+    """The catalog's COLUMNS as one float64 array, missing values as 0."""
+    return np.nan_to_num(np.column_stack([catalog.column(c) for c in COLUMNS]).astype(np.float64))
+
+
+class MealOptimizer:
+    """
+    Greedy-with-repair solver that picks foods and serving multipliers from
+    a FoodCatalog to hit a daily calorie target and macro bounds.
+
+    Candidates come from the catalog's calorie range index and the nutrient
+    KD-tree, so each solve only looks at a few hundred foods.
+    """
+
+    def __init__(self, catalog, neighbors, macros=None):
+        self.catalog = catalog
+        self.neighbors = neighbors
+        # `macros` (from `meal_macros`, e.g. attached from shared memory) is used as is
+        self.macros = meal_macros(catalog) if macros is None else macros
+        kcal = self.macros[:, KCAL]
+        # Protein calories per calorie, for ranking protein-dense foods
+        self.protein_density = np.where(kcal > 0, self.macros[:, PROTEIN] * 4 / np.maximum(kcal, 1), 0)
+
+    # ─── Candidate pool ─────────────────────────────────────────────────────
+    def candidate_pool(self, targets, meals=3, pool_size=POOL_SIZE):
+        """Rows worth considering: foods near a per-meal profile plus protein-dense ones."""
+        kcal = targets['calories']
+        per_meal = {
+            'Caloric Value': kcal / meals,
+            'Protein': sum(targets['protein']) / 2 / meals,
+            'Fat': sum(targets['fat']) / 2 / meals,
+            'Carbohydrates': sum(targets['carbs']) / 2 / meals,
+        }
+        near, _ = self.neighbors.query(per_meal, k=pool_size // 2)
+
+        # Snack-to-meal sized foods, most protein-dense first
+        window = self.catalog.range('Caloric Value', 30, kcal / 2)
+        dense = window[np.argsort(-self.protein_density[window], kind='stable')[:pool_size // 2]]
+        pool = np.unique(np.concatenate([near, dense]))
+        return pool[self.macros[pool, KCAL] > 0]
+
+    # ─── Scoring ────────────────────────────────────────────────────────────
+    @staticmethod
+    def _penalty(totals, targets):
+        """
+        Squared relative violations, vectorized over rows of `totals`, plus
+        a small pull toward the exact calorie target. Bound violations
+        dominate so the solver prefers any feasible plan over a closer miss.
+        """
+        kcal = targets['calories']
+        cal_dev = (totals[..., KCAL] - kcal) / kcal
+        cal_out = np.maximum(np.abs(cal_dev) - targets.get('tolerance', CALORIE_TOLERANCE), 0)
+        protein_lo, protein_hi = targets['protein']
+        fat_lo, fat_hi = targets['fat']
+        carb_lo, carb_hi = targets['carbs']
+        protein_out = (np.maximum(protein_lo - totals[..., PROTEIN], 0)
+                       + np.maximum(totals[..., PROTEIN] - protein_hi, 0)) / max(protein_hi, 1)
+        fat_out = (np.maximum(fat_lo - totals[..., FAT], 0) + np.maximum(totals[..., FAT] - fat_hi, 0)) / max(fat_hi, 1)
+        carb_out = (np.maximum(carb_lo - totals[..., CARBS], 0) + np.maximum(totals[..., CARBS] - carb_hi, 0)) / max(carb_hi, 1)
+        return 10 * (cal_out ** 2 + protein_out ** 2 + fat_out ** 2 + carb_out ** 2) + 0.1 * cal_dev ** 2
+
+    def _is_feasible(self, totals, targets):
+        return not missed_targets(totals, targets)
+
+    # ─── Solver ─────────────────────────────────────────────────────────────
+    def _greedy(self, chosen, totals, used, options, targets, max_items, deadline):
+        """Add the best food/portion while it lowers the penalty."""
+        while len(chosen) < max_items and not self._is_feasible(totals, targets):
+            scores = self._penalty(totals + options, targets)
+            scores[used] = np.inf
+            i, p = np.unravel_index(np.argmin(scores), scores.shape)
+            if scores[i, p] >= self._penalty(totals, targets) or time.perf_counter() > deadline:
+                break
+            chosen.append((i, p))
+            used[i] = True
+            totals = totals + options[i, p]
+        return totals
+
+    def _repair(self, chosen, totals, used, options, targets, deadline):
+        """Swap, re-size or drop single items while that lowers the penalty."""
+        improved = True
+        while improved and chosen and time.perf_counter() < deadline:
+            improved = False
+            current = self._penalty(totals, targets)
+            for slot, (i, p) in enumerate(chosen):
+                base = totals - options[i, p]
+                if self._penalty(base, targets) < current - 1e-9:
+                    del chosen[slot]
+                    used[i] = False
+                    totals, improved = base, True
+                    break
+                scores = self._penalty(base + options, targets)
+                used[i] = False
+                scores[used] = np.inf
+                j, q = np.unravel_index(np.argmin(scores), scores.shape)
+                if scores[j, q] < current - 1e-9:
+                    used[j] = True
+                    chosen[slot] = (j, q)
+                    totals, improved = base + options[j, q], True
+                    break
+                used[i] = True
+        return totals
+
+    def solve(self, targets, time_budget=0.1, max_items=MAX_ITEMS, seed=0, pool_size=POOL_SIZE):
+        """
+        Pick up to `max_items` (row, servings) pairs.
+
+        Greedy construction adds the best food/portion each step and repair
+        swaps, re-sizes or drops items while that lowers the penalty. If the
+        result still misses a bound, a few items are dropped at random and
+        the two steps rerun until the time budget runs out.
+        """
+        deadline = time.perf_counter() + time_budget
+        pool = self.candidate_pool(targets, pool_size=pool_size)
+        if not len(pool):
+            return [], np.zeros(len(COLUMNS))
+        # options[i, p] = macros of pool food i at portion p
+        options = self.macros[pool][:, None, :] * PORTIONS[None, :, None]
+        rng = np.random.default_rng(seed)
+
+        chosen, used = [], np.zeros(len(pool), dtype=bool)
+        totals = self._greedy(chosen, np.zeros(len(COLUMNS)), used, options, targets, max_items, deadline)
+        totals = self._repair(chosen, totals, used, options, targets, deadline)
+        best = (self._penalty(totals, targets), list(chosen), totals)
+
+        while not self._is_feasible(best[2], targets) and best[1] and time.perf_counter() < deadline:
+            chosen = list(best[1])
+            for _ in range(rng.integers(1, min(2, len(chosen)) + 1)):
+                chosen.pop(rng.integers(len(chosen)))
+            used = np.zeros(len(pool), dtype=bool)
+            used[[i for i, _ in chosen]] = True
+            totals = sum((options[i, p] for i, p in chosen), np.zeros(len(COLUMNS)))
+            totals = self._greedy(chosen, totals, used, options, targets, max_items, deadline)
+            totals = self._repair(chosen, totals, used, options, targets, deadline)
+            score = self._penalty(totals, targets)
+            if self._is_feasible(totals, targets) or score < best[0]:
+                best = (score, list(chosen), totals)
+
+        _, chosen, totals = best
+        return [(int(pool[i]), float(PORTIONS[p])) for i, p in chosen], totals
+
+    def solve_relaxed(self, targets, time_budget=0.1, steps=RELAXATION_STEPS):
+        """
+        Run `solve` through `steps` until a plan meets that step's targets,
+        giving each step an equal share of what is left of the budget.
+        Returns (picks, totals, slack of the step used).
+        """
+        deadline = time.perf_counter() + time_budget
+        best = None
+        for n, step in enumerate(steps):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 and best is not None:
+                break
+            relaxed = relax_targets(targets, step['slack'])
+            picks, totals = self.solve(relaxed, time_budget=max(remaining, 0) / (len(steps) - n),
+                                       pool_size=step['pool_size'])
+            score = self._penalty(totals, targets)
+            if best is None or score < best[0]:
+                best = (score, picks, totals, step['slack'])
+            if self._is_feasible(totals, relaxed):
+                return picks, totals, step['slack']
+        return best[1], best[2], best[3]
+
+    def plan(self, targets, time_budget=0.1):
+        """
+        Solve and shape the result into item records plus totals. `feasible`
+        is judged against the original targets; `relaxed` is the slack that
+        was needed and `missed` lists the original bounds still not met.
+        """
+        picks, totals, slack = self.solve_relaxed(targets, time_budget=time_budget)
+        items = []
+        for row, servings in picks:
+            food = self.catalog.record(row, COLUMNS)
+            items.append({
+                'name': food['name'],
+                'servings': servings,
+                'calories': round(food['Caloric Value'] * servings, 1),
+                'protein': round(food['Protein'] * servings, 1),
+                'fat': round(food['Fat'] * servings, 1),
+                'carbs': round(food['Carbohydrates'] * servings, 1),
+            })
+        return {
+            'items': items,
+            'totals': {
+                'calories': round(float(totals[KCAL]), 1),
+                'protein': round(float(totals[PROTEIN]), 1),
+                'fat': round(float(totals[FAT]), 1),
+                'carbs': round(float(totals[CARBS]), 1),
+            },
+            'targets': targets,
+            'feasible': self._is_feasible(totals, targets),
+            'relaxed': slack,
+            'missed': missed_targets(totals, targets),
+        }
+
+
+def build_meal_optimizer(catalog, neighbors, macros=None):
+    """Build a MealOptimizer over a FoodCatalog and its NutrientNeighbors index."""
+    return MealOptimizer(catalog, neighbors, macros)
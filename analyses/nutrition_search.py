@@ -1,105 +1,196 @@
 import os
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from fatsecret import Fatsecret
 import pandas as pd
-from requests_oauthlib import OAuth1
-import requests
-from oauthlib.oauth1 import SIGNATURE_HMAC  
-import time
-import uuid
-import hmac
-import hashlib
-import base64
-import urllib.parse
+
+from analyses.fatsecret_client import get_client, parse_recipes
+from analyses.food_store import FOOD_STORE_PATH, LocalFoodStore, catalog_foods
+from analyses.loaders import load_food_catalog
+from analyses.paged_search import PagedSearch
+from analyses.search_cache import TTLCache, SQLiteCache, TieredCache, fill_cache, normalize_query
 
 
 # Retrieve FatSecret credentials from secrets or environment variables.
 FATSECRET_KEY = st.secrets.get("FATSECRET_KEY") or os.getenv("FATSECRET_KEY")
 FATSECRET_SECRET = st.secrets.get("FATSECRET_SECRET") or os.getenv("FATSECRET_SECRET")
-BASE_URL         = "https://platform.fatsecret.com/rest/server.api"
 
-def _pct(s: str) -> str:
-    return urllib.parse.quote(str(s), safe='-._~')
+@lru_cache(maxsize=1)
+def get_fatsecret():
+    """The `fatsecret` package client, imported and created on first use."""
+    from fatsecret import Fatsecret
+    return Fatsecret("9638c53a214b49d2b160e5aae7d66614", "6774cce97ca2413fa8798bf51cbedbdf")
+
+# Shared by every session in this process. Set FOOD_SEARCH_CACHE_DB to a
+# file path to add an on-disk tier that survives restarts.
+FOOD_SEARCH_TTL = int(os.getenv("FOOD_SEARCH_TTL", "3600"))
+_cache_db = os.getenv("FOOD_SEARCH_CACHE_DB")
+food_search_cache = TieredCache(
+    TTLCache(maxsize=2048, ttl=FOOD_SEARCH_TTL),
+    SQLiteCache(_cache_db, ttl=FOOD_SEARCH_TTL * 24) if _cache_db else None,
+)
 
-def _build_sorted_param_string(params: dict) -> str:
+# food_description looks like "Per 100g - Calories: 52kcal | Fat: 0.17g | Carbs: 13.81g | Protein: 0.26g"
+MACRO_PATTERNS = {
+    "calories": r"Calories:\s*([\d.]+)",
+    "fat":      r"Fat:\s*([\d.]+)",
+    "carbs":    r"Carbs:\s*([\d.]+)",
+    "protein":  r"Protein:\s*([\d.]+)",
+}
+RECORD_FIELDS = ["food_id", "food_name", "food_url", "brand_name", "food_description",
+                 "serving", "calories", "fat", "carbs", "protein", "source"]
+
+def parse_foods(foods, source="fatsecret"):
     """
-    Percent-encode every key & value, then sort lexicographically,
-    then join with & into k=v pairs.
+    FatSecret food dicts -> typed records (serving text plus kcal, fat, carbs
+    and protein as floats, None when missing). Parses a whole result page at
+    once with vectorized string ops.
     """
-    enc_pairs = []
-    for k,v in params.items():
-        enc_k = _pct(k)
-        enc_v = _pct(v)
-        enc_pairs.append((enc_k, enc_v))
-    enc_pairs.sort()  # lexicographical on (key, value)
-    return "&".join(f"{k}={v}" for k,v in enc_pairs)
-
-fs = Fatsecret("9638c53a214b49d2b160e5aae7d66614", "6774cce97ca2413fa8798bf51cbedbdf")
-def search_foods(query):
-    foods = fs.foods_search(query)
+    if not foods:
+        return []
+    frame = pd.DataFrame(list(foods)).reindex(columns=["food_id", "food_name", "food_url", "brand_name", "food_description"])
+    desc = frame["food_description"].fillna("").astype(str)
+    frame["serving"] = desc.str.extract(r"^(.*?)\s+-\s+", expand=False).str.strip()
+    for field, pattern in MACRO_PATTERNS.items():
+        frame[field] = pd.to_numeric(desc.str.extract(pattern, expand=False), errors="coerce")
+    frame["source"] = source
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame[RECORD_FIELDS].to_dict("records")
+
+# Every food fetched from FatSecret is kept here for offline answers
+food_store = LocalFoodStore(os.getenv("FOOD_STORE_DB", FOOD_STORE_PATH))
+
+# Seconds to wait on FatSecret before answering from local data instead.
+# The remote call keeps running and still fills the cache and store.
+FOOD_SEARCH_BUDGET = float(os.getenv("FOOD_SEARCH_BUDGET", "2.0"))
+# Remote calls allowed in flight at once; further misses skip FatSecret
+# (and answer from local data) rather than queue behind hung calls
+FOOD_SEARCH_MAX_IN_FLIGHT = int(os.getenv("FOOD_SEARCH_MAX_IN_FLIGHT", "4"))
+LOCAL_RESULTS_LIMIT = 200
+_remote_pool = ThreadPoolExecutor(max_workers=FOOD_SEARCH_MAX_IN_FLIGHT, thread_name_prefix="fatsecret")
+_remote_slots = threading.BoundedSemaphore(FOOD_SEARCH_MAX_IN_FLIGHT)
+
+def local_foods(query, limit=LOCAL_RESULTS_LIMIT):
+    """Foods from the local store, then the FINAL FOOD DATASET, without duplicate names."""
+    foods, seen = [], set()
+    for food in food_store.search(query, limit) + catalog_foods(load_food_catalog(), query, limit):
+        name = normalize_query(food["food_name"])
+        if name not in seen:
+            seen.add(name)
+            foods.append(food)
+    return foods[:limit]
+
+def _snapshot(foods):
+    """Copy freshly fetched foods into the local store (best effort)."""
+    try:
+        food_store.add_foods(foods or [])
+    except Exception:
+        pass
     return foods
 
-def search_recipes_by_calories(cal_min: int, cal_max: int, max_results: int = 5) -> list:
+def _within_budget(fetch, budget):
+    """
+    Run `fetch()` on the remote pool and wait at most `budget` seconds.
+    Returns None if it is late or fails, or at once if every remote slot is
+    taken; a late call still finishes in the background, so its results
+    reach the cache and the local store.
+    """
+    if not _remote_slots.acquire(blocking=False):
+        return None
+
+    def run():
+        try:
+            return fetch()
+        finally:
+            _remote_slots.release()
+
+    try:
+        future = _remote_pool.submit(run)
+    except RuntimeError:  # pool shut down
+        _remote_slots.release()
+        return None
+    try:
+        return future.result(timeout=budget)
+    except Exception:  # includes the futures TimeoutError
+        return None
+
+def _cached_or_remote(key, fresh, budget):
+    """
+    The cached value for `key`, read right away; on a miss, `fresh()` under
+    the latency budget (None if it is late, fails or is skipped).
+    """
+    value = food_search_cache.get(key)
+    if value is not None:
+        return value
+    return _within_budget(lambda: fill_cache(food_search_cache, key, fresh), budget)
+
+def search_foods(query, budget=None):
+    """
+    FatSecret foods.search as parsed food records, answered from the shared
+    cache when possible and from local data if FatSecret fails or takes
+    longer than `budget` seconds.
+    """
+    def fresh():
+        return _snapshot(parse_foods(get_fatsecret().foods_search(query)))
+
+    foods = _cached_or_remote(f"foods|{normalize_query(query)}", fresh,
+                              FOOD_SEARCH_BUDGET if budget is None else budget)
+    return foods if foods is not None else local_foods(query)
+
+def food_pages(query, page_size=20, budget=None):
+    """
+    Lazy PagedSearch over foods.search; each page is fetched on demand (and
+    the next one prefetched) and goes through the shared search cache. Pages
+    that miss the latency budget come from local data instead, flagged as
+    fallback pages (see PagedSearch.is_fallback).
+    """
+    key = normalize_query(query)
+    client = get_client(FATSECRET_KEY, FATSECRET_SECRET)
+    budget = FOOD_SEARCH_BUDGET if budget is None else budget
+
+    def fetch(page_number, size):
+        def fresh():
+            items, total = client.foods_search(query, page_number, size)
+            return {"items": _snapshot(parse_foods(items)), "total": total}
+
+        page = _cached_or_remote(f"foods|{key}|page={page_number}|size={size}", fresh, budget)
+        if page is None:
+            # Marked as a fallback page, so its total does not replace FatSecret's
+            local = local_foods(query)
+            return local[page_number * size:(page_number + 1) * size], len(local), True
+        return page["items"], page["total"]
+
+    return PagedSearch(fetch, page_size)
+
+def search_cache_stats():
+    """Hit/miss counters of the food search cache, per tier."""
+    return food_search_cache.stats()
+
+def recipe_pages(cal_min: int, cal_max: int, page_size: int = 5, timeout=None) -> PagedSearch:
+    """Lazy PagedSearch over recipes.search.v3 for a calorie range."""
+    client = get_client(FATSECRET_KEY, FATSECRET_SECRET)
+    return PagedSearch(
+        lambda page_number, size: client.recipes_search(cal_min, cal_max, page_number, size, timeout=timeout),
+        page_size,
+    )
+
+def search_recipes_by_calories(cal_min: int, cal_max: int, max_results: int = 5, timeout=None, page_number: int = 0) -> list:
     """
-    FatSecret recipes.search.v3 on server.api with manual OAuth1 HMAC‑SHA1
-    and fully sorted parameter string (including the trailing '&' on the secret).
+    FatSecret recipes.search.v3 on server.api, signed with OAuth1 HMAC‑SHA1
+    by the shared pooled client.
     """
-    # 1) API parameters (must include method & blank search_expression)
-    api_params = {
-        "method":             "recipes.search.v3",
-        "format":             "json",
-        # "search_expression":  "",                 # blank but required
-        "calories.from":      str(cal_min),
-        "calories.to":        str(cal_max),
-        "max_results":        str(max_results),
-        "page_number":        "0",
-        "sort_by":            "caloriesPerServingAscending",
-    }
-
-    # 2) OAuth parameters (no signature yet)
-    oauth = {
-        "oauth_consumer_key":     FATSECRET_KEY,
-        "oauth_signature_method": "HMAC-SHA1",
-        "oauth_timestamp":        str(int(time.time())),
-        "oauth_nonce":            uuid.uuid4().hex,
-        "oauth_version":          "1.0"
-    }
-
-    # 3) Merge and build the sorted param string
-    all_params = {**api_params, **oauth}
-    param_str  = _build_sorted_param_string(all_params)
-
-    # 4) Build signature base string
-    base_string = "&".join([
-        "POST",
-        _pct(BASE_URL),
-        _pct(param_str)
-    ])
-
-    # 5) Sign with HMAC‑SHA1, note the trailing '&'
-    key        = _pct(FATSECRET_SECRET)
-    digest     = hmac.new(key.encode(), base_string.encode(), hashlib.sha1).digest()
-    signature  = base64.b64encode(digest).decode()
-    oauth["oauth_signature"] = signature
-
-    # 6) Final POST body = api_params + oauth (including signature)
-    post_data = {**api_params, **oauth}
-
-    # 7) Fire the request
-    resp = requests.post(BASE_URL, data=post_data)
-    # If it still fails, uncomment the next two lines to inspect:
-    print(resp.status_code, resp.url)
-    print(resp.text)
-
-    # 8) Parse results
-    js   = resp.json()
-    recs = js.get("recipes", {}).get("recipe", [])
-    if isinstance(recs, dict):
-        recs = [recs]
-
-    return [
-        {"id":   r["recipe_id"],
-         "name": r["recipe_name"],
-         "url":  r["recipe_url"]}
-        for r in recs
-    ]
\ No newline at end of file
+    client = get_client(FATSECRET_KEY, FATSECRET_SECRET)
+    body = client.server_api(
+        "recipes.search.v3",
+        timeout=timeout,
+        **{
+            # "search_expression":  "",                 # blank but required
+            "calories.from":      str(cal_min),
+            "calories.to":        str(cal_max),
+            "max_results":        str(max_results),
+            "page_number":        str(page_number),
+            "sort_by":            "caloriesPerServingAscending",
+        },
+    )
+    return parse_recipes(body)
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every PagedSearch: a couple of threads is plenty for one-page lookahead
+_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="page-prefetch")
+
+
+class PagedSearch:
+    """
+    Lazy, page-at-a-time view over a paginated API search.
+
+    `fetch_page(page_number, page_size)` must return `(items, total_results)`,
+    or `(items, total, True)` for a page answered from a fallback source
+    (e.g. local data while the API is down). The two totals are kept
+    apart: `total` is only ever the API's, `fallback_total` the fallback's,
+    and paging uses the API's whenever it is known.
+
+    Pages are only requested when asked for; whenever page i is read, page
+    i + 1 is fetched in the background so "Next" is usually instant. At most
+    `keep_pages` pages are held in memory, so paging through thousands of
+    results keeps memory flat.
+    """
+
+    def __init__(self, fetch_page, page_size=20, keep_pages=4, prefetch=True):
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.keep_pages = max(keep_pages, 2)
+        self.prefetch = prefetch
+        self.total = None
+        self.fallback_total = None
+        self.fallback_pages = set()
+        self._pages = OrderedDict()   # page number -> Future of the items
+        self._lock = threading.Lock()
+
+    def _fetch(self, number):
+        items, total, *fallback = self.fetch_page(number, self.page_size)
+        if fallback and fallback[0]:
+            self.fallback_total = total
+            self.fallback_pages.add(number)
+        else:
+            self.total = total
+            self.fallback_pages.discard(number)
+        return items
+
+    def _known_total(self):
+        return self.total if self.total is not None else self.fallback_total
+
+    def is_fallback(self, number):
+        """True if page `number` was last answered by the fallback source."""
+        return number in self.fallback_pages
+
+    def _future(self, number):
+        with self._lock:
+            future = self._pages.get(number)
+            if future is None:
+                future = _prefetch_pool.submit(self._fetch, number)
+                self._pages[number] = future
+            self._pages.move_to_end(number)
+            while len(self._pages) > self.keep_pages:
+                self._pages.popitem(last=False)
+            return future
+
+    def page(self, number):
+        """Items of page `number` (0-based); empty past the last page."""
+        if number < 0 or (self._known_total() is not None and number >= self.num_pages):
+            return []
+        future = self._future(number)
+        try:
+            items = future.result()
+        except Exception:
+            # Do not keep a failed page around; the next read retries it
+            with self._lock:
+                if self._pages.get(number) is future:
+                    del self._pages[number]
+            raise
+        if self.prefetch and number + 1 < self.num_pages:
+            self._future(number + 1)
+        return items
+
+    @property
+    def num_pages(self):
+        """
+        Page count from the API's total (the fallback's until the API has
+        answered); the first page is fetched if needed.
+        """
+        if self._known_total() is None:
+            self._future(0).result()
+        return (self._known_total() + self.page_size - 1) // self.page_size
+
+    def pages(self, start=0):
+        """Yield page lists lazily from `start` until the results run out."""
+        number = start
+        while True:
+            items = self.page(number)
+            if not items:
+                return
+            yield items
+            number += 1
+
+    def __iter__(self):
+        for items in self.pages():
+            yield from items
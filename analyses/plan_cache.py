@@ -0,0 +1,151 @@
+import os
+import glob
+import time
+import threading
+from collections import namedtuple
+
+from analyses.cohort_stats import TRACKER_PATH
+from analyses.data_store import PROCESSED_DIR
+from analyses.loaders import clear_process_caches
+from analyses.search_cache import TTLCache, cached_call
+
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "4096"))
+PLAN_CACHE_TTL = int(os.getenv("PLAN_CACHE_TTL", "86400"))
+VERSION_CHECK_INTERVAL = 5.0  # seconds between dataset stat() checks
+
+# Files a plan is computed from; any change to them invalidates the cache
+# and the loaded datasets behind it
+PLAN_SOURCES = [
+    os.path.join(PROCESSED_DIR, "megaGymDataset.csv"),
+    os.path.join(PROCESSED_DIR, "exercises_cleaned.csv"),
+    TRACKER_PATH,
+    os.path.join(PROCESSED_DIR, "FINAL FOOD DATASET", "FOOD-DATA-GROUP*.csv"),
+]
+
+PlanKey = namedtuple("PlanKey", [
+    "weight_lbs", "height_in", "age", "gender", "activity_level", "goal", "body_parts", "workout_type",
+])
+
+
+def normalize_profile(weight_lbs, height_in, age, gender, activity_level, goal,
+                      body_parts=None, workout_type=None):
+    """
+    Cache key for a plan request: weight to the nearest pound, height to the
+    nearest half inch, lower-cased labels and body parts sorted, so
+    near-identical profiles share one entry. The cached parts are computed
+    from these normalized values, so every profile with this key shares them.
+    """
+    if isinstance(body_parts, str):
+        body_parts = body_parts.split(" and ")
+    parts = tuple(sorted({p.strip().lower() for p in body_parts or [] if p and p.strip()}))
+    return PlanKey(
+        weight_lbs=float(round(weight_lbs)),
+        height_in=round(height_in * 2) / 2,
+        age=int(age),
+        gender=str(gender).strip().lower(),
+        activity_level=str(activity_level).strip().lower(),
+        goal=str(goal).strip().lower(),
+        body_parts=parts,
+        workout_type=str(workout_type).strip().lower() if workout_type else None,
+    )
+
+
+def dataset_version(patterns=PLAN_SOURCES):
+    """(path, size, mtime_ns) of every source file; changes when any is edited."""
+    stamp = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            stat = os.stat(path)
+            stamp.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(stamp)
+
+
+class PlanCache:
+    """
+    Bounded LRU + TTL cache of the member-independent parts of plans,
+    shared by every session.
+
+    Entries are dropped when the source datasets change (checked at most
+    every `check_interval` seconds), and `reload()` is called so the
+    rebuilt entries read the new files. Concurrent misses on one key share a
+    single build (see search_cache.cached_call).
+    """
+
+    def __init__(self, maxsize=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL, version=dataset_version,
+                 check_interval=VERSION_CHECK_INTERVAL, reload=clear_process_caches):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.version = version
+        self.reload = reload
+        self.check_interval = check_interval
+        self.invalidations = 0
+        self.builds = 0
+        self._version = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        current = self.version()
+        with self._lock:
+            self._checked = now
+            if self._version is not None and current != self._version:
+                self.reload()
+                self.cache.clear()
+                self.invalidations += 1
+            self._version = current
+
+    def get_or_build(self, key, build):
+        """A copy of the cached value for `key`, built with `build()` on a miss."""
+        self._check_version()
+
+        def counted():
+            with self._lock:
+                self.builds += 1
+            return build()
+        return cached_call(self.cache, key, counted)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return {**self.cache.stats(), "builds": self.builds, "invalidations": self.invalidations}
+
+
+def build_plan_parts(key):
+    """
+    The parts of a plan every member with this normalized key shares: BMI,
+    calories, the workout candidate pools and the daily meal plan.
+    """
+    from analyses.ai_chatbot import (
+        calculate_bmi, calculate_daily_calories, estimate_session_calories, get_daily_meal_plan, workout_pools,
+    )
+    bmi = calculate_bmi(key.weight_lbs, key.height_in)
+    daily_cals = calculate_daily_calories(key.weight_lbs, key.height_in, key.age, key.gender, key.activity_level, bmi)
+    return {
+        "bmi": bmi,
+        "daily_calories": daily_cals,
+        "workout_pools": workout_pools(" and ".join(key.body_parts), key.workout_type),
+        "session_calories": estimate_session_calories(key.workout_type.title()) if key.workout_type else None,
+        "daily_meals": get_daily_meal_plan(daily_cals, key.goal),
+    }
+
+
+# Shared by every session in this process
+plan_cache = PlanCache()
+
+
+def get_plan(weight_lbs, height_in, age, gender, activity_level, goal,
+             body_parts=None, workout_type=None, user_id=None, seed=None):
+    """
+    Plan for a profile: BMI, calories and daily meals come from the shared
+    cache; workouts are drawn per request from the cached candidate pools,
+    seeded by `user_id`/`seed` and avoiding the member's recent picks (see
+    ai_chatbot.draw_workouts). Returns a dict the caller may modify.
+    """
+    from analyses.ai_chatbot import draw_workouts
+    key = normalize_profile(weight_lbs, height_in, age, gender, activity_level, goal, body_parts, workout_type)
+    plan = plan_cache.get_or_build(key, lambda: build_plan_parts(key))
+    plan["workouts"] = draw_workouts(plan.pop("workout_pools"), user_id, seed)
+    return plan
@@ -0,0 +1,273 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+from analyses.exercise_index import tokenize
+
+# Canonical muscle groups the scheduler balances, and the dataset labels
+# (lower-cased) that count towards each one
+MUSCLE_GROUPS = {
+    'chest': ['chest', 'upper chest', 'lower chest'],
+    'back': ['back', 'upper back', 'lats', 'middle back', 'lower back', 'traps'],
+    'shoulders': ['shoulders', 'rear deltoids', 'neck'],
+    'arms': ['biceps', 'triceps', 'forearms'],
+    'core': ['core', 'full core', 'obliques', 'lower abs', 'abdominals', 'hip flexors', 'hips'],
+    'legs': ['legs', 'quadriceps', 'hamstrings', 'calves', 'glutes', 'adductors', 'abductors'],
+}
+GROUP_NAMES = list(MUSCLE_GROUPS)
+GROUP_BITS = {g: 1 << i for i, g in enumerate(GROUP_NAMES)}
+_LABEL_TO_GROUP = {label: g for g, labels in MUSCLE_GROUPS.items() for label in labels}
+
+LEVELS = {'beginner': 0, 'intermediate': 1, 'advanced': 2, 'expert': 2}
+DEFAULT_SETS_REPS = {0: (3, 10), 1: (3, 12), 2: (4, 10)}
+NO_EQUIPMENT = {'none', 'body only', 'bodyweight', ''}
+# Working time plus rest per set, used to turn a cohort kcal/min rate into
+# an estimate for exercises the datasets give no calories for
+MINUTES_PER_SET = 2.0
+
+
+def muscle_mask(labels):
+    """Bitmask of canonical groups for a list of dataset muscle labels; 0 if any is unknown."""
+    mask = 0
+    for label in labels:
+        group = _LABEL_TO_GROUP.get(label)
+        if group is None:
+            return 0
+        mask |= GROUP_BITS[group]
+    return mask
+
+
+def equipment_ok(cell, available):
+    """
+    True if `cell` can be done with `available` equipment. Commas separate
+    items that are all needed; "or" separates alternatives for one item.
+    """
+    if not isinstance(cell, str) or cell.strip().lower() in NO_EQUIPMENT:
+        return True
+    for requirement in cell.split(','):
+        options = tokenize(requirement)
+        if not any(opt in NO_EQUIPMENT or any(a in opt or opt in a for a in available) for opt in options):
+            return False
+    return True
+
+
+def program_pool(exercises, workouts, calorie_rate=None):
+    """
+    exercises_cleaned and the mega gym dataset merged into one row per
+    usable exercise: name, muscle bitmask, level, equipment (categorical),
+    type, sets/reps, calories and source.
+
+    `calorie_rate(workout_type, level)` gives a kcal/min rate (e.g. from the
+    tracker cohort, see cohort_stats); it fills in calories for exercises
+    the datasets do not list any for (flagged in `calories_estimated`).
+    """
+    names, masks, levels, equipment, types, sets, reps, calories, sources = ([] for _ in range(9))
+
+    for _, row in exercises.iterrows():
+        mask = muscle_mask(tokenize(row.get('Target Muscle Group')))
+        if not mask:
+            continue
+        names.append(row['Name of Exercise'])
+        masks.append(mask)
+        levels.append(LEVELS.get(str(row.get('Difficulty Level')).lower(), 1))
+        equipment.append(row.get('Equipment Needed'))
+        types.append('strength')
+        sets.append(row.get('Sets'))
+        reps.append(row.get('Reps'))
+        calories.append(row.get('Burns Calories'))
+        sources.append('exercises')
+
+    part_masks = {p: muscle_mask([str(p).lower()]) for p in workouts['BodyPart'].dropna().unique()}
+    for title, part, level, equip, wtype in zip(
+        workouts['Title'], workouts['BodyPart'], workouts['Level'], workouts['Equipment'], workouts['Type']
+    ):
+        mask = part_masks.get(part, 0)
+        if not mask:
+            continue
+        lvl = LEVELS.get(str(level).lower(), 1)
+        names.append(title)
+        masks.append(mask)
+        levels.append(lvl)
+        equipment.append(equip)
+        types.append(str(wtype).lower())
+        sets.append(DEFAULT_SETS_REPS[lvl][0])
+        reps.append(DEFAULT_SETS_REPS[lvl][1])
+        calories.append(np.nan)
+        sources.append('megaGym')
+
+    pool = pd.DataFrame({
+        'name': pd.Series(names, dtype=str),
+        'mask': np.asarray(masks, dtype=np.int64),
+        'level': np.asarray(levels, dtype=np.int8),
+        'equipment': pd.Categorical(equipment),
+        'type': pd.Series(types, dtype=str),
+        'sets': pd.to_numeric(pd.Series(sets), errors='coerce').astype(float),
+        'reps': pd.to_numeric(pd.Series(reps), errors='coerce').astype(float),
+        'calories': pd.to_numeric(pd.Series(calories), errors='coerce').astype(float),
+        'calories_estimated': False,
+        'source': pd.Series(sources, dtype=str),
+    })
+    if calorie_rate is not None:
+        _estimate_calories(pool, calorie_rate)
+    return pool
+
+
+def _estimate_calories(pool, calorie_rate):
+    missing = pool['calories'].isna() & pool['sets'].notna()
+    rates = {}
+    for row in np.flatnonzero(missing):
+        key = (pool.at[row, 'type'], int(pool.at[row, 'level']))
+        if key not in rates:
+            rates[key] = calorie_rate(*key)
+        if rates[key] is not None:
+            pool.at[row, 'calories'] = round(rates[key] * pool.at[row, 'sets'] * MINUTES_PER_SET, 1)
+            pool.at[row, 'calories_estimated'] = True
+
+
+class ProgramBuilder:
+    """
+    Weekly split generator over a `program_pool` frame.
+
+    The pool's columns are used as flat arrays (muscle bitmask, level,
+    equipment code, sets/reps, calories) without copying, so a pool
+    attached from shared memory stays shared; each call only filters those
+    arrays and runs a small search over muscle-group day assignments.
+    """
+
+    def __init__(self, pool):
+        self.names = pool['name'].array
+        self.masks = pool['mask'].to_numpy()
+        self.levels = pool['level'].to_numpy()
+        equipment = pool['equipment'].array
+        self.equipment_codes = equipment.codes
+        self.equipment_values = np.asarray(equipment.categories, dtype=object)
+        self.types = pool['type'].array
+        self.sets = pool['sets'].to_numpy()
+        self.reps = pool['reps'].to_numpy()
+        self.calories = pool['calories'].to_numpy()
+        self.calories_estimated = pool['calories_estimated'].to_numpy()
+        self.sources = pool['source'].array
+        self._equipment_cache = {}
+
+    # ─── Candidate pools ────────────────────────────────────────────────────
+    def _equipment_mask(self, available):
+        """Rows doable with `available` equipment (None means a full gym)."""
+        if available is None:
+            return np.ones(len(self.names), dtype=bool)
+        key = tuple(sorted(a.strip().lower() for a in available))
+        if key not in self._equipment_cache:
+            ok = np.array([equipment_ok(v, key) for v in self.equipment_values] + [True])
+            self._equipment_cache[key] = ok[self.equipment_codes]  # code -1 picks the trailing True
+        return self._equipment_cache[key]
+
+    def candidate_pools(self, difficulty=None, equipment=None, workout_type=None):
+        """Row ids usable under the filters, per canonical muscle group."""
+        keep = self._equipment_mask(equipment)
+        if difficulty and difficulty != 'All':
+            keep = keep & (self.levels <= LEVELS.get(difficulty.lower(), 2))
+        if workout_type:
+            keep = keep & ((self.sources == 'exercises') | (self.types == workout_type.lower()))
+        rows = np.flatnonzero(keep)
+        return {g: rows[(self.masks[rows] & bit) != 0] for g, bit in GROUP_BITS.items()}
+
+    # ─── Scheduling ─────────────────────────────────────────────────────────
+    @staticmethod
+    def schedule_groups(groups, days, per_day, wrap=False):
+        """
+        Assign `per_day` muscle groups to each day so no group appears on two
+        consecutive days, spreading groups as evenly as possible.
+        Depth-first search, trying the least-used groups first.
+        """
+        groups = list(groups)
+        best = None
+
+        def search(day, plan, counts):
+            nonlocal best
+            if day == days:
+                best = [list(p) for p in plan]
+                return True
+            banned = set(plan[-1]) if plan else set()
+            if wrap and day == days - 1 and days > 1:
+                banned |= set(plan[0])
+            allowed = [g for g in groups if g not in banned]
+            allowed.sort(key=lambda g: (counts[g], groups.index(g)))
+            for combo in itertools.combinations(allowed, per_day):
+                plan.append(combo)
+                for g in combo:
+                    counts[g] += 1
+                if search(day + 1, plan, counts):
+                    return True
+                for g in combo:
+                    counts[g] -= 1
+                plan.pop()
+            return False
+
+        search(0, [], {g: 0 for g in groups})
+        return best
+
+    def build(self, days=4, exercises_per_day=6, difficulty=None, equipment=None, workout_type=None, seed=None):
+        """
+        A multi-day program: for each day the focus muscle groups and
+        `exercises_per_day` exercises working only those groups, so no group
+        is trained on consecutive days. Exercises do not repeat in the week.
+        """
+        rng = np.random.default_rng(seed)
+        pools = self.candidate_pools(difficulty, equipment, workout_type)
+        groups = [g for g in GROUP_NAMES if len(pools[g])]
+        if not groups:
+            return {'days': [], 'message': 'No exercises match those filters.'}
+        # Fewer groups per day if the split cannot avoid back-to-back days
+        schedule = None
+        for per_day in range(max(1, min(3, len(groups) // 2)), 0, -1):
+            schedule = self.schedule_groups(groups, days, per_day, wrap=(days == 7))
+            if schedule is not None:
+                break
+        if schedule is None:
+            return {'days': [], 'message': 'Could not schedule muscle groups without back-to-back days.'}
+
+        used = set()
+        program = []
+        for day, focus in enumerate(schedule, 1):
+            day_bits = sum(GROUP_BITS[g] for g in focus)
+            # Only exercises whose every muscle is in today's focus
+            day_pools = []
+            for g in focus:
+                rows = pools[g][(self.masks[pools[g]] & ~day_bits) == 0]
+                day_pools.append(list(rng.permutation(rows)))
+            picks = []
+            # Round-robin over the focus groups keeps the day balanced
+            while len(picks) < exercises_per_day and any(day_pools):
+                for pool in day_pools:
+                    while pool and pool[-1] in used:
+                        pool.pop()
+                    if pool and len(picks) < exercises_per_day:
+                        row = pool.pop()
+                        used.add(row)
+                        picks.append(row)
+            program.append({
+                'day': day,
+                'focus': list(focus),
+                'exercises': [self.record(r) for r in picks],
+            })
+        calories = [e['calories'] for d in program for e in d['exercises'] if e['calories'] is not None]
+        return {'days': program, 'estimated_calories': round(float(sum(calories)), 1)}
+
+    def record(self, row):
+        groups = [g for g, bit in GROUP_BITS.items() if self.masks[row] & bit]
+        calories = self.calories[row]
+        code = self.equipment_codes[row]
+        return {
+            'name': self.names[row],
+            'muscle_groups': groups,
+            'equipment': self.equipment_values[code] if code >= 0 else None,
+            'sets': None if np.isnan(self.sets[row]) else int(self.sets[row]),
+            'reps': None if np.isnan(self.reps[row]) else int(self.reps[row]),
+            'calories': None if np.isnan(calories) else float(calories),
+            'calories_estimated': bool(self.calories_estimated[row]),
+            'source': self.sources[row],
+        }
+
+
+def build_program_builder(exercises, workouts, calorie_rate=None):
+    """Build a ProgramBuilder from the exercises and mega gym DataFrames."""
+    return ProgramBuilder(program_pool(exercises, workouts, calorie_rate))
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+
+class SortedRangeIndex:
+    """
+    Sorted copy of one numeric column plus the row-id permutation that
+    produced it, so `lo <= value <= hi` queries are two binary searches.
+
+    Missing values are dropped from the index and never returned.
+    """
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        order = np.argsort(values, kind="stable")
+        order = order[~np.isnan(values[order])]
+        self.n_rows = len(values)
+        self.row_ids = order
+        self.sorted_values = values[order]
+
+    def __len__(self):
+        return self.n_rows
+
+    def range(self, lo=None, hi=None):
+        """
+        Row ids with lo <= value <= hi, in ascending value order.
+        Either bound may be None for an open-ended range.
+        """
+        start = 0 if lo is None else np.searchsorted(self.sorted_values, lo, side="left")
+        stop = len(self.sorted_values) if hi is None else np.searchsorted(self.sorted_values, hi, side="right")
+        if stop <= start:
+            return self.row_ids[:0]
+        return self.row_ids[start:stop]
+
+
+def build_range_index(df, column):
+    """Build a SortedRangeIndex over `df[column]` (coerced to numeric)."""
+    return SortedRangeIndex(pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan))
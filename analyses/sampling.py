@@ -0,0 +1,78 @@
+import hashlib
+
+import numpy as np
+
+from analyses.tracker_store import USERS_DIR, member_registry
+
+# How many of a member's recent plans to steer away from
+RECENT_PLANS = 5
+
+
+def plan_rng(user_id=None, seed=None):
+    """
+    numpy Generator for one plan. With a user id and/or seed the stream is
+    fixed (same member + seed -> same draws); with neither it is fresh.
+    """
+    if user_id is None and seed is None:
+        return np.random.default_rng()
+    digest = hashlib.sha256(f"{user_id}|{seed}".encode("utf-8")).digest()
+    return np.random.default_rng(np.frombuffer(digest[:16], dtype=np.uint32))
+
+
+def draw(rng, rows, k=1, avoid=()):
+    """
+    `k` distinct row ids from the candidate array `rows`, uniformly among
+    those not in `avoid`; avoided rows are only used when nothing else is
+    left. No DataFrame is built, only the id array is indexed.
+    """
+    rows = np.asarray(rows)
+    if not len(rows) or k <= 0:
+        return rows[:0]
+    if avoid:
+        blocked = np.isin(rows, np.fromiter(avoid, dtype=rows.dtype, count=len(avoid)))
+        fresh, stale = rows[~blocked], rows[blocked]
+    else:
+        fresh, stale = rows, rows[:0]
+    picks = rng.choice(fresh, size=min(k, len(fresh)), replace=False) if len(fresh) else fresh
+    if len(picks) < k and len(stale):
+        extra = rng.choice(stale, size=min(k - len(picks), len(stale)), replace=False)
+        picks = np.concatenate([picks, extra])
+    return picks
+
+
+class SelectionHistory:
+    """
+    Row ids shown in each member's last few plans, per kind ("workout",
+    "meal"), stored with the members (see tracker_store.MemberRegistry) so
+    every worker process sees the same history.
+
+    A plan's avoid-set only holds plans drawn with other seeds, and drawing
+    the same seed again replaces that seed's entry: the same member, seed
+    and stored history always give the same plan.
+    """
+
+    def __init__(self, root=USERS_DIR, max_plans=RECENT_PLANS, ttl=7 * 86400):
+        self.root = root
+        self.max_plans = max_plans
+        self.ttl = ttl
+
+    @staticmethod
+    def _seed(seed):
+        return "" if seed is None else str(seed)
+
+    def recent(self, user_id, kind, seed=None, plans=None):
+        """Set of row ids shown in the member's last `plans` plans of this kind with another seed."""
+        if user_id is None:
+            return set()
+        return member_registry(self.root).recent_picks(
+            str(user_id), kind, self._seed(seed), plans or self.max_plans, self.ttl)
+
+    def record(self, user_id, kind, rows, seed=None):
+        if user_id is None:
+            return
+        # One more than max_plans, so `recent` still sees max_plans other seeds
+        member_registry(self.root).record_picks(str(user_id), kind, self._seed(seed), rows, self.max_plans + 1)
+
+
+# Shared by every session in this process
+selection_history = SelectionHistory()
@@ -0,0 +1,222 @@
+import os
+import copy
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    """Case- and whitespace-insensitive cache key for a search string."""
+    return " ".join(str(query).lower().split())
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries also expire after `ttl`
+    seconds. Counts hits, misses and expirations.
+
+    Values are deep-copied going in and coming out, so a caller that edits
+    a result (a list of records, a DataFrame) cannot change what other
+    callers get. Pass `copy_values=False` for values the owner guards itself.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600, copy_values=True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.copy_values = copy_values
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires, value = item
+            if expires < now:
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value) if self.copy_values else value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        if self.copy_values:
+            value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses, "expired": self.expired}
+
+
+class SQLiteCache:
+    """
+    On-disk key/value tier with the same get/set interface. Values are
+    stored as JSON with an absolute expiry time (wall clock).
+    """
+
+    def __init__(self, path, ttl=86400):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)"
+            )
+
+    def _connect(self):
+        # One connection per thread; SQLite handles locking between processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                (key, expires, json.dumps(value)),
+            )
+
+    def purge_expired(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def stats(self):
+        (size,) = self._connect().execute("SELECT COUNT(*) FROM cache").fetchone()
+        return {"size": size, "hits": self.hits, "misses": self.misses}
+
+
+class TieredCache:
+    """Memory tier in front of an optional disk tier; disk hits are promoted."""
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return default if value is None else value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def stats(self):
+        out = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            out["disk"] = self.disk.stats()
+        return out
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for one key into a single call: the first
+    caller runs it, later ones wait for it to finish and share its outcome.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """(result of fn(), True if this caller ran it)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, False
+        try:
+            call.value = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, True
+
+
+_flights = SingleFlight()
+
+
+def cached_call(cache, key, fetch):
+    """
+    Return cache[key], calling `fetch()` and storing its result on a miss.
+    Concurrent misses on one key share a single `fetch()`; the callers that
+    waited read the stored result back from the cache.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    return fill_cache(cache, key, fetch)
+
+
+def fill_cache(cache, key, fetch):
+    """
+    The miss path of `cached_call`: `fetch()` and store the result under
+    `key`, for callers that already looked the key up themselves.
+    """
+    def load():
+        value = fetch()
+        if value is not None:
+            cache.set(key, value)
+        return value
+
+    value, leader = _flights.do((id(cache), key), load)
+    return value if leader else cache.get(key)
@@ -0,0 +1,375 @@
+import os
+import sys
+import json
+import uuid
+import tempfile
+import subprocess
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+from analyses.data_store import (
+    PROCESSED_DIR, SHARED_MANIFEST_ENV, decode_column, decode_strings, dictionary_encode, encode_strings, load_dataset,
+)
+
+# Workers find the published datasets through this variable (path to a JSON manifest)
+MANIFEST_ENV = SHARED_MANIFEST_ENV
+
+# The FOOD-DATA-GROUP files are not listed: workers attach the food catalog
+# built from them (see SHARED_FRAMES in analyses.loaders) instead
+DEFAULT_DATASETS = [
+    "megaGymDataset.csv",
+    "exercises_cleaned.csv",
+    "exercises4.csv",
+]
+# pandas' default string dtype; its columns are shared as Arrow buffers
+ARROW_STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+
+
+def _dataset_key(name):
+    path = name if os.path.isabs(name) else os.path.join(PROCESSED_DIR, name)
+    return os.path.normcase(os.path.abspath(path))
+
+
+# ─── Publishing (launcher process) ──────────────────────────────────────────
+class SharedDatasets:
+    """
+    Owner of the shared-memory blocks holding a set of datasets.
+
+    Numeric columns are copied once into their own block. Columns of
+    pandas' Arrow-backed string dtype keep their Arrow layout (validity
+    bitmap, offsets, UTF-8 data), so workers wrap the blocks without
+    decoding; other string columns are dictionary-encoded (int32 codes
+    plus a UTF-8 dictionary). Frames and arrays built from the datasets
+    (the food catalog, program pool, ...) can be published by name too.
+    The manifest records block names, dtypes and shapes so any process can
+    attach zero-copy views.
+    """
+
+    def __init__(self, prefix=None):
+        self.prefix = prefix or f"wr_{uuid.uuid4().hex[:8]}"
+        self.blocks = []
+        self.manifest = {"datasets": {}, "frames": {}, "arrays": {}}
+
+    def _put(self, array):
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(
+            name=f"{self.prefix}_{len(self.blocks)}", create=True, size=max(array.nbytes, 1)
+        )
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        self.blocks.append(shm)
+        return {"shm": shm.name, "dtype": array.dtype.str, "shape": list(array.shape)}
+
+    def _put_buffer(self, buffer, dtype=np.uint8, count=-1):
+        return self._put(np.empty(0, dtype) if buffer is None else np.frombuffer(buffer, dtype, count))
+
+    def _frame_entry(self, df):
+        columns = []
+        for col_name in df.columns:
+            col = df[col_name]
+            if pd.api.types.is_bool_dtype(col) or pd.api.types.is_numeric_dtype(col):
+                columns.append({"name": col_name, "kind": "numeric", "data": self._put(col.to_numpy())})
+            elif col.dtype == ARROW_STRING:
+                import pyarrow as pa
+                # A fresh array, so offsets start at 0 with no slice offset
+                arr = pa.array(col.to_numpy(dtype=object), type=pa.large_string(), from_pandas=True)
+                validity, offsets, data = arr.buffers()
+                columns.append({
+                    "name": col_name,
+                    "kind": "arrow_string",
+                    "null_count": arr.null_count,
+                    "validity": None if validity is None else self._put_buffer(validity),
+                    "offsets": self._put_buffer(offsets, np.int64, len(arr) + 1),
+                    "data": self._put_buffer(data),
+                })
+            else:
+                categorical = isinstance(col.dtype, pd.CategoricalDtype)
+                if categorical:
+                    # Keep the categories (and their order) as they are
+                    codes = col.cat.codes.to_numpy(dtype=np.int32)
+                    uniques = np.asarray(col.cat.categories, dtype=object)
+                else:
+                    codes, uniques = dictionary_encode(col)
+                blob, offsets = encode_strings(uniques)
+                columns.append({
+                    "name": col_name,
+                    "kind": "string",
+                    "categorical": categorical,
+                    "codes": self._put(codes),
+                    "dict": self._put(blob),
+                    "offsets": self._put(offsets),
+                })
+        return {"n_rows": len(df), "columns": columns}
+
+    def publish(self, name, df):
+        """Copy a dataset's columns into shared memory and record them under its path."""
+        self.manifest["datasets"][_dataset_key(name)] = self._frame_entry(df)
+
+    def publish_frame(self, name, df):
+        """Publish a DataFrame built from the datasets, found by workers with `shared_frame(name, ...)`."""
+        self.manifest["frames"][name] = self._frame_entry(df)
+
+    def publish_array(self, name, array):
+        """Publish a numpy array, found by workers with `shared_array(name, ...)`."""
+        self.manifest["arrays"][name] = self._put(array)
+
+    def publish_derived(self, frames, arrays):
+        """Build and publish every {name: build()} of `frames` and `arrays`."""
+        for name, build in frames.items():
+            self.publish_frame(name, build())
+        for name, build in arrays.items():
+            self.publish_array(name, build())
+        return self
+
+    def publish_files(self, names=DEFAULT_DATASETS, categorical=None):
+        """
+        Load each dataset through the column cache and publish it, with the
+        columns `categorical[name]` lists as Categoricals.
+        """
+        categorical = categorical or {}
+        for name in names:
+            self.publish(name, load_dataset(name, categorical.get(name, ())))
+        return self
+
+    @property
+    def nbytes(self):
+        return sum(shm.size for shm in self.blocks)
+
+    def write_manifest(self, path=None):
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix=f"{self.prefix}_", suffix=".json")
+            os.close(fd)
+        with open(path, "w") as f:
+            json.dump(self.manifest, f)
+        return path
+
+    def close(self):
+        """Release and unlink every block (only the owner should call this)."""
+        for shm in self.blocks:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── Attaching (worker processes) ───────────────────────────────────────────
+_attached = {}    # block name -> SharedMemory, kept open for the life of the process
+_manifest = None
+
+
+class _AttachedBlock(shared_memory.SharedMemory):
+    def __del__(self):
+        # Views (numpy, Arrow) can outlive the block object at interpreter
+        # exit, when closing would fail; the mapping ends with the process
+        pass
+
+
+def _open_block(name):
+    shm = _attached.get(name)
+    if shm is None:
+        if sys.version_info >= (3, 13):
+            shm = _AttachedBlock(name=name, track=False)
+        else:
+            shm = _AttachedBlock(name=name)
+            # Before 3.13 attaching registers the block with this process's
+            # resource tracker, which would unlink it when the worker exits
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        _attached[name] = shm
+    return shm
+
+
+def _view(spec):
+    shm = _open_block(spec["shm"])
+    array = np.ndarray(tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]), buffer=shm.buf)
+    array.flags.writeable = False  # shared by every worker
+    return array
+
+
+def shared_manifest():
+    """The manifest published by the launcher, or None when not running under it."""
+    global _manifest
+    path = os.environ.get(MANIFEST_ENV)
+    if not path:
+        return None
+    if _manifest is None:
+        try:
+            with open(path) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+    return _manifest
+
+
+def _arrow_strings(col, n_rows):
+    import pyarrow as pa
+    validity = None if col["validity"] is None else pa.py_buffer(_view(col["validity"]))
+    arr = pa.Array.from_buffers(pa.large_string(), n_rows,
+                                [validity, pa.py_buffer(_view(col["offsets"])), pa.py_buffer(_view(col["data"]))],
+                                null_count=col["null_count"])
+    return pd.arrays.ArrowStringArray(pa.chunked_array([arr]), dtype=ARROW_STRING)
+
+
+def _attach_frame(entry):
+    data = {}
+    for col in entry["columns"]:
+        if col["kind"] == "numeric":
+            data[col["name"]] = _view(col["data"])
+        elif col["kind"] == "arrow_string":
+            data[col["name"]] = _arrow_strings(col, entry["n_rows"])
+        else:
+            uniques = decode_strings(_view(col["dict"]), _view(col["offsets"]))
+            data[col["name"]] = decode_column(_view(col["codes"]), uniques, col["categorical"])
+    # copy=False keeps one block per column, so nothing is consolidated (copied)
+    return pd.DataFrame(data, copy=False)
+
+
+def attach_dataset(name):
+    """
+    A published dataset as a DataFrame whose numeric and string columns are
+    zero-copy views of the shared blocks; None if it was not published.
+    """
+    manifest = shared_manifest()
+    entry = manifest and manifest["datasets"].get(_dataset_key(name))
+    return None if entry is None else _attach_frame(entry)
+
+
+def shared_frame(name, build):
+    """The frame published as `name` (zero-copy), or `build()` when not running under the launcher."""
+    manifest = shared_manifest()
+    entry = manifest and manifest.get("frames", {}).get(name)
+    return build() if entry is None else _attach_frame(entry)
+
+
+def shared_array(name, build):
+    """The array published as `name` (a read-only view), or `build()` when not published."""
+    manifest = shared_manifest()
+    spec = manifest and manifest.get("arrays", {}).get(name)
+    return build() if spec is None else _view(spec)
+
+
+# ─── Launcher ───────────────────────────────────────────────────────────────
+@contextmanager
+def published(datasets=DEFAULT_DATASETS):
+    """
+    Publish `datasets` and the structures workers build from them (see
+    SHARED_FRAMES / SHARED_ARRAYS in analyses.loaders); yields the
+    environment workers need to attach them. Blocks are removed on exit.
+    """
+    from analyses.loaders import CATEGORICAL_COLUMNS, SHARED_ARRAYS, SHARED_FRAMES
+    with SharedDatasets() as shared:
+        shared.publish_files(datasets, CATEGORICAL_COLUMNS)
+        shared.publish_derived(SHARED_FRAMES, SHARED_ARRAYS)
+        manifest_path = shared.write_manifest()
+        print(f"Shared {len(shared.manifest['datasets'])} datasets and "
+              f"{len(shared.manifest['frames']) + len(shared.manifest['arrays'])} derived structures "
+              f"({shared.nbytes / 1e6:.1f} MB) in {len(shared.blocks)} blocks", file=sys.stderr)
+        try:
+            yield dict(os.environ, **{MANIFEST_ENV: manifest_path})
+        finally:
+            os.remove(manifest_path)
+
+
+def launch(command, datasets=DEFAULT_DATASETS):
+    """
+    Publish `datasets` to shared memory, run `command` (e.g. uvicorn with
+    several workers) with the manifest in its environment, and clean the
+    blocks up when it exits. Returns the command's exit code.
+    """
+    with published(datasets) as env:
+        try:
+            return subprocess.call(command, env=env)
+        except KeyboardInterrupt:
+            return 130
+
+
+# ─── Memory check ───────────────────────────────────────────────────────────
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# A worker: import everything, wait, load every dataset and structure, wait
+_WORKER = """
+import gc, sys
+import pyarrow, sklearn.neighbors
+from analyses import food_neighbors, loaders
+print("ready", flush=True)
+sys.stdin.readline()
+for name in ("load_exercises", "load_exercise_index", "load_workout_index", "load_program_builder",
+             "load_food_catalog", "load_food_neighbors", "load_meal_optimizer"):
+    getattr(loaders, name)()
+gc.collect()
+print("loaded", flush=True)
+sys.stdin.readline()
+"""
+
+
+def process_memory(pid):
+    """{"rss", "pss", "uss"} of a process in MB, from /proc/<pid>/smaps_rollup (Linux)."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {"rss": fields["Rss"], "pss": fields["Pss"],
+            "uss": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def _worker_growth(workers, env):
+    procs = [subprocess.Popen([sys.executable, "-c", _WORKER], cwd=ROOT_DIR, env=env, text=True,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE) for _ in range(workers)]
+    try:
+        for p in procs:
+            p.stdout.readline()
+        before = [process_memory(p.pid) for p in procs]
+        for p in procs:
+            p.stdin.write("\n")
+            p.stdin.flush()
+        for p in procs:
+            if p.stdout.readline().strip() != "loaded":
+                raise RuntimeError("memory check worker failed")
+        # Measured while every worker is alive, so PSS splits the shared pages
+        after = [process_memory(p.pid) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return {k: sum(a[k] - b[k] for a, b in zip(after, before)) / workers for k in ("rss", "pss", "uss")}
+
+
+def check_memory(workers=2, datasets=DEFAULT_DATASETS):
+    """
+    Memory each of `workers` concurrent processes gains by loading every
+    dataset and structure through analyses.loaders: once building its own
+    copies ("local") and once attached to shared memory ("shared").
+    Returns {mode: {"rss", "pss", "uss"}} in MB per worker. RSS counts
+    shared pages in full in every process; PSS splits them between the
+    processes mapping them and USS leaves them out, so those two show the
+    saving.
+    """
+    env = {k: v for k, v in os.environ.items() if k != MANIFEST_ENV}
+    result = {"local": _worker_growth(workers, env)}
+    with published(datasets) as shared_env:
+        result["shared"] = _worker_growth(workers, shared_env)
+    return result
+
+
+if __name__ == "__main__":
+    # python -m analyses.shared_data uvicorn api.service:app --workers 4
+    # python -m analyses.shared_data --check-memory [workers]
+    args = sys.argv[1:] or ["uvicorn", "api.service:app", "--workers", str(os.cpu_count() or 1)]
+    if args[0] == "--check-memory":
+        workers = int(args[1]) if len(args) > 1 else 2
+        for mode, growth in check_memory(workers).items():
+            print(f"{mode:>6}: " + "  ".join(f"{k.upper()} +{v:.1f} MB" for k, v in growth.items())
+                  + f" per worker ({workers} workers)")
+        sys.exit(0)
+    sys.exit(launch(args))
@@ -0,0 +1,83 @@
+import re
+import sys
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class StartupProfile:
+    """
+    Wall-clock timings of named startup phases (imports, data loads, index
+    builds), recorded the first time each one runs in this process.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []   # (kind, name, seconds, offset from start)
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name, kind="load"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                if (kind, name) not in self._seen:
+                    self._seen.add((kind, name))
+                    self.phases.append((kind, name, elapsed, start - self.started))
+
+    def import_module(self, name):
+        """Import `name`, timing it if this process had not imported it yet."""
+        if name in sys.modules:
+            return sys.modules[name]
+        with self.phase(name, kind="import"):
+            __import__(name)
+        return sys.modules[name]
+
+    def report(self):
+        """DataFrame of recorded phases, slowest first."""
+        frame = pd.DataFrame(self.phases, columns=["kind", "name", "seconds", "started_at"])
+        return frame.sort_values("seconds", ascending=False).reset_index(drop=True)
+
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(module, python=sys.executable, top=25):
+    """
+    Cold-import breakdown of `module` in a fresh interpreter (`-X importtime`):
+    the `top` slowest modules by cumulative time, in milliseconds.
+    """
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append({
+                "module": name,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            })
+    frame = pd.DataFrame(rows, columns=["module", "self_ms", "cumulative_ms", "depth"])
+    return frame.sort_values("cumulative_ms", ascending=False).head(top).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # python -m analyses.startup_profile [module ...]
+    modules = sys.argv[1:] or [
+        "analyses.filter_data", "analyses.nutrition_search", "analyses.ai_chatbot", "analyses.tracker_store",
+    ]
+    for name in modules:
+        print(f"\n== {name} ==")
+        print(import_times(name, top=10).to_string(index=False))
@@ -0,0 +1,85 @@
+import pandas as pd
+
+from analyses.tracker_store import IMPORT_BATCH_SIZE
+
+KG_TO_LBS = 2.20462
+
+# Tracker column -> (export column, unit factor) candidates, first match wins.
+# The defaults cover workout_fitness_tracker_data.csv and common device exports.
+COLUMN_ALIASES = {
+    "date": [("date", None), ("Date", None), ("Day", None), ("Timestamp", None)],
+    "weight": [("weight", 1.0), ("Weight (lbs)", 1.0), ("Weight (kg)", KG_TO_LBS), ("Weight", 1.0)],
+    "calories_burned": [("calories_burned", 1.0), ("Calories Burned", 1.0), ("Active Calories", 1.0), ("Calories", 1.0)],
+    "steps": [("steps", 1.0), ("Steps Taken", 1.0), ("Steps", 1.0)],
+    "sleep_time": [("sleep_time", 1.0), ("Sleep Hours", 1.0), ("Sleep Duration", 1.0), ("Sleep (hr)", 1.0)],
+    "heart_rate": [("heart_rate", 1.0), ("Heart Rate (bpm)", 1.0), ("Heart Rate", 1.0), ("Avg Heart Rate", 1.0)],
+}
+USER_COLUMN = "User ID"
+
+
+def map_columns(header, aliases=COLUMN_ALIASES):
+    """{tracker column: (export column, factor)} for the columns present in `header`."""
+    present = set(header)
+    mapping = {}
+    for target, candidates in aliases.items():
+        for source, factor in candidates:
+            if source in present:
+                mapping[target] = (source, factor)
+                break
+    return mapping
+
+
+def _header(source):
+    header = pd.read_csv(source, nrows=0).columns.tolist()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return header
+
+
+def import_export(store, source, user_id=None, today=None, chunksize=50_000,
+                  batch_size=IMPORT_BATCH_SIZE, aliases=COLUMN_ALIASES):
+    """
+    Stream a wearable / tracker CSV export into a TrackerStore.
+
+    The file is read `chunksize` rows at a time with only the mapped
+    columns; each chunk is written in `batch_size`-row transactions and
+    dates already stored are skipped by the store's date index. The export
+    must have a date column, and rows dated after `today` (default: the
+    current date) are rejected. Exports with a "User ID" column need
+    `user_id`, and only that member's rows are kept.
+
+    Returns {"read", "added", "skipped", "rejected"} row counts, where
+    "rejected" counts future-dated rows.
+    """
+    header = _header(source)
+    mapping = map_columns(header, aliases)
+    metrics = [c for c in mapping if c != "date"]
+    if not metrics:
+        raise ValueError(f"No tracker columns found in export header: {header}")
+    if "date" not in mapping:
+        raise ValueError(f"Export has no date column (expected one of: "
+                         f"{', '.join(src for src, _ in aliases['date'])})")
+    filter_user = USER_COLUMN in header
+    if filter_user and user_id is None:
+        raise ValueError(f'Export has a "{USER_COLUMN}" column; pass the member whose rows to import')
+
+    usecols = [src for src, _ in mapping.values()] + ([USER_COLUMN] if filter_user else [])
+    latest = pd.Timestamp(today if today is not None else pd.Timestamp.now()).normalize()
+    read = added = rejected = 0
+    for chunk in pd.read_csv(source, usecols=usecols, chunksize=chunksize):
+        if filter_user:
+            chunk = chunk[chunk[USER_COLUMN].astype(str) == str(user_id)]
+        if chunk.empty:
+            continue
+        out = pd.DataFrame(index=chunk.index)
+        out["date"] = pd.to_datetime(chunk[mapping["date"][0]], errors="coerce").dt.normalize()
+        for target in metrics:
+            src, factor = mapping[target]
+            out[target] = pd.to_numeric(chunk[src], errors="coerce") * factor
+        future = out["date"] > latest
+        rejected += int(future.sum())
+        # Several readings on one day (e.g. per-workout rows) collapse to the first
+        out = out[~future].dropna(subset=["date"]).drop_duplicates("date")
+        read += len(chunk)
+        added += store.import_frame(out, batch_size)
+    return {"read": read, "added": added, "skipped": read - added - rejected, "rejected": rejected}
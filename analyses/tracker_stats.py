@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+
+METRICS = ["weight", "calories_burned", "steps", "sleep_time", "heart_rate"]
+WINDOWS = (7, 30)
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+class _Growable:
+    """
+    Immutable view of the first `size` slots of a shared, over-allocated
+    buffer. `appended` returns a new view one slot longer, writing only
+    past every existing view's end, so views already handed out never
+    change; amortized O(1) per append.
+    """
+
+    def __init__(self, values=(), dtype=np.float64):
+        values = np.asarray(values, dtype=dtype)
+        self._data = np.empty(max(16, len(values) * 2), dtype=dtype)
+        self._data[:len(values)] = values
+        self.size = len(values)
+        self._filled = [self.size]  # slots written in the buffer, shared by its views
+
+    def appended(self, value):
+        out = object.__new__(_Growable)
+        if self.size == self._filled[0] and self.size < len(self._data):
+            out._data, out._filled = self._data, self._filled
+        else:
+            # Full, or another view already wrote past our end: copy
+            out._data = np.empty(max(16, self.size * 2), dtype=self._data.dtype)
+            out._data[:self.size] = self._data[:self.size]
+            out._filled = [self.size]
+        out._data[self.size] = value
+        out._filled[0] = self.size + 1
+        out.size = self.size + 1
+        return out
+
+    @property
+    def values(self):
+        return self._data[:self.size]
+
+
+class TrackerStats:
+    """
+    Rolling and weekly statistics over one member's tracker history.
+
+    Per metric it keeps prefix sums of the values, their counts and the
+    day-weighted sums a linear trend needs, so appending a newer day is O(1)
+    and any rolling mean or trend is two lookups. Entries must arrive in
+    date order; anything else (edits, deletes, back-fills) means rebuilding
+    with `from_frame`.
+
+    Instances never change once built: `appended` returns a new one, so a
+    reader holding a TrackerStats always sees consistent arrays.
+    """
+
+    def __init__(self, days=(), values=None):
+        self.days = _Growable(days, np.int64)
+        values = values or {m: np.full(len(self.days.values), np.nan) for m in METRICS}
+        self.values = {}
+        self._sum, self._count, self._xsum, self._xxsum, self._xysum = {}, {}, {}, {}, {}
+        # Trend sums use days since the first entry to keep x*x small
+        self.origin = int(self.days.values[0]) if len(self.days.values) else None
+        x = (self.days.values - (self.origin or 0)).astype(np.float64)
+        for m in METRICS:
+            v = np.asarray(values.get(m, np.full(len(x), np.nan)), dtype=np.float64)
+            ok = ~np.isnan(v)
+            v0 = np.where(ok, v, 0.0)
+            self.values[m] = _Growable(v)
+            # prefix[i] covers rows [0, i)
+            self._sum[m] = _Growable(np.concatenate([[0.0], np.cumsum(v0)]))
+            self._count[m] = _Growable(np.concatenate([[0.0], np.cumsum(ok)]))
+            self._xsum[m] = _Growable(np.concatenate([[0.0], np.cumsum(np.where(ok, x, 0.0))]))
+            self._xxsum[m] = _Growable(np.concatenate([[0.0], np.cumsum(np.where(ok, x * x, 0.0))]))
+            self._xysum[m] = _Growable(np.concatenate([[0.0], np.cumsum(x * v0)]))
+        self.weekly_buckets = {}
+        for i, day in enumerate(self.days.values):
+            self._add_to_week(day, {m: self.values[m].values[i] for m in METRICS})
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Build from TrackerStore.entries() (sorted by date)."""
+        days = (frame["date"].to_numpy(dtype="datetime64[D]") - _EPOCH).astype(np.int64)
+        values = {m: pd.to_numeric(frame[m], errors="coerce").to_numpy(dtype=np.float64) for m in METRICS if m in frame}
+        return cls(days, values)
+
+    def __len__(self):
+        return self.days.size
+
+    @property
+    def last_day(self):
+        return int(self.days.values[-1]) if len(self) else None
+
+    # ─── Updates ────────────────────────────────────────────────────────────
+    @staticmethod
+    def _week(day):
+        return int(day) - (int(day) + 3) % 7  # Monday of that week (1970-01-01 was a Thursday)
+
+    def _add_to_week(self, day, row):
+        bucket = self.weekly_buckets.setdefault(self._week(day), {m: [0.0, 0] for m in METRICS})
+        for m in METRICS:
+            value = row.get(m)
+            if value is not None and not np.isnan(value):
+                bucket[m][0] += value
+                bucket[m][1] += 1
+
+    def appended(self, date, row):
+        """
+        A new TrackerStats with the entry for `date` ({metric: value}) added,
+        or None if `date` is not after the last day held. `self` is unchanged.
+        """
+        day = int((np.datetime64(pd.Timestamp(date).date(), "D") - _EPOCH).astype(np.int64))
+        if len(self) and day <= self.last_day:
+            return None
+        out = object.__new__(TrackerStats)
+        out.origin = day if self.origin is None else self.origin
+        out.days = self.days.appended(day)
+        x = day - out.origin
+        out.values, out._sum, out._count, out._xsum, out._xxsum, out._xysum = {}, {}, {}, {}, {}, {}
+        for m in METRICS:
+            value = row.get(m)
+            value = np.nan if value is None else float(value)
+            ok = not np.isnan(value)
+            v0 = value if ok else 0.0
+            out.values[m] = self.values[m].appended(value)
+            out._sum[m] = self._sum[m].appended(self._sum[m].values[-1] + v0)
+            out._count[m] = self._count[m].appended(self._count[m].values[-1] + ok)
+            out._xsum[m] = self._xsum[m].appended(self._xsum[m].values[-1] + (x if ok else 0))
+            out._xxsum[m] = self._xxsum[m].appended(self._xxsum[m].values[-1] + (x * x if ok else 0))
+            out._xysum[m] = self._xysum[m].appended(self._xysum[m].values[-1] + x * v0)
+        # Only the touched week's bucket is copied; the others are shared
+        out.weekly_buckets = dict(self.weekly_buckets)
+        week = self._week(day)
+        if week in out.weekly_buckets:
+            out.weekly_buckets[week] = {m: list(v) for m, v in out.weekly_buckets[week].items()}
+        out._add_to_week(day, row)
+        return out
+
+    # ─── Queries ────────────────────────────────────────────────────────────
+    def _span(self, window, end=None):
+        """Row range [lo, hi) of the `window` days ending at row `end - 1`."""
+        days = self.days.values
+        hi = len(days) if end is None else end
+        lo = int(np.searchsorted(days, days[hi - 1] - window + 1)) if hi else 0
+        return lo, hi
+
+    def rolling_mean(self, metric, window=7):
+        """Mean of `metric` over the last `window` days (None if no values)."""
+        if not len(self):
+            return None
+        lo, hi = self._span(window)
+        n = self._count[metric].values[hi] - self._count[metric].values[lo]
+        return None if n == 0 else float((self._sum[metric].values[hi] - self._sum[metric].values[lo]) / n)
+
+    def rolling_series(self, metric, window=7):
+        """Rolling mean of `metric` at every entry, vectorized over the prefix sums."""
+        days = self.days.values
+        lo = np.searchsorted(days, days - window + 1)
+        hi = np.arange(1, len(days) + 1)
+        s, c = self._sum[metric].values, self._count[metric].values
+        n = c[hi] - c[lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, (s[hi] - s[lo]) / n, np.nan)
+
+    def trend(self, metric, window=30):
+        """Least-squares slope of `metric` per week over the last `window` days."""
+        if not len(self):
+            return None
+        lo, hi = self._span(window)
+
+        def d(prefix):
+            return prefix[metric].values[hi] - prefix[metric].values[lo]
+
+        n, sx, sy, sxx, sxy = d(self._count), d(self._xsum), d(self._sum), d(self._xxsum), d(self._xysum)
+        denom = n * sxx - sx * sx
+        if n < 2 or denom <= 0:
+            return None
+        return float((n * sxy - sx * sy) / denom * 7)
+
+    def summary(self):
+        """Latest 7/30-day means and 30-day weekly trend per metric."""
+        out = {}
+        for m in METRICS:
+            out[m] = {f"mean_{w}d": self.rolling_mean(m, w) for w in WINDOWS}
+            out[m]["trend_per_week"] = self.trend(m, 30)
+        return out
+
+    def frame(self):
+        """The history as a DataFrame shaped like TrackerStore.entries()."""
+        frame = pd.DataFrame({m: self.values[m].values for m in METRICS})
+        frame.insert(0, "date", pd.to_datetime(_EPOCH + self.days.values.astype("timedelta64[D]")))
+        return frame
+
+    def weekly(self):
+        """Weekly means and entry counts, oldest week first."""
+        rows = []
+        for week in sorted(self.weekly_buckets):
+            bucket = self.weekly_buckets[week]
+            row = {"week": _EPOCH + np.timedelta64(week, "D")}
+            for m in METRICS:
+                total, n = bucket[m]
+                row[m] = total / n if n else np.nan
+            row["entries"] = max(bucket[m][1] for m in METRICS)
+            rows.append(row)
+        frame = pd.DataFrame(rows, columns=["week", *METRICS, "entries"])
+        frame["week"] = pd.to_datetime(frame["week"])
+        return frame
+
+    def series(self, metric, window=None, max_points=500):
+        """
+        (dates, values) of `metric`, or of its rolling mean when `window` is
+        set, downsampled with LTTB to at most `max_points` points.
+        """
+        days = self.days.values
+        values = self.values[metric].values if window is None else self.rolling_series(metric, window)
+        keep = ~np.isnan(values)
+        x, y = days[keep], values[keep]
+        idx = lttb(x.astype(np.float64), y, max_points)
+        return (_EPOCH + x[idx].astype("timedelta64[D]")).astype("datetime64[ns]"), y[idx]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of `n_out` points
+    (always including the first and last) that preserve the line's shape.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 inner buckets
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], max(edges[b + 1], edges[b] + 1)
+        # Average of the next bucket (or the last point) is the third vertex
+        if b + 2 < len(edges):
+            nxt = slice(edges[b + 1], max(edges[b + 2], edges[b + 1] + 1))
+            cx, cy = x[nxt].mean(), y[nxt].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        bx, by = x[start:stop], y[start:stop]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        out[b + 1] = a
+    return out
@@ -0,0 +1,344 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+
+from analyses.tracker_stats import TrackerStats
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+TRACKER_DB = os.path.join(BASE_DIR, "../data/user/progress.db")
+LEGACY_CSV = os.path.join(BASE_DIR, "../data/user/progress.csv")
+USERS_DIR = os.path.join(BASE_DIR, "../data/user/members")
+DEFAULT_USER = "default"
+IMPORT_BATCH_SIZE = 5000
+MAX_OPEN_STORES = int(os.getenv("MAX_OPEN_STORES", "256"))
+
+COLUMNS = ["date", "weight", "calories_burned", "steps", "sleep_time", "heart_rate"]
+
+
+class TrackerStore:
+    """
+    Personal Tracker entries in SQLite, one row per date.
+
+    The date is the primary key, so adding an entry is a single indexed
+    insert (duplicates are rejected by the index, not by re-reading the
+    history) and concurrent sessions are serialized by SQLite's locking.
+    """
+
+    def __init__(self, path=TRACKER_DB, legacy_csv=None):
+        self.path = path
+        self._local = threading.local()
+        self._stats = None
+        self._stats_key = None
+        self._stats_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._write() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    date            TEXT PRIMARY KEY,
+                    weight          REAL,
+                    calories_burned REAL,
+                    steps           INTEGER,
+                    sleep_time      REAL,
+                    heart_rate      REAL
+                )""")
+            # Stores created before heart rate was tracked
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "heart_rate" not in existing:
+                conn.execute("ALTER TABLE entries ADD COLUMN heart_rate REAL")
+        if legacy_csv and os.path.isfile(legacy_csv) and len(self) == 0:
+            self.import_csv(legacy_csv)
+
+    def _connect(self):
+        # One connection per thread; Streamlit runs each session on its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """
+        Write transaction that takes the database lock up front (BEGIN
+        IMMEDIATE), so two writers never interleave a read and a write.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _key(date):
+        return pd.Timestamp(date).date().isoformat()
+
+    def add_entry(self, date, weight, calories_burned, steps, sleep_time, heart_rate=None):
+        """Insert one day's entry; returns False if that date already exists."""
+        with self._write() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO entries (date, weight, calories_burned, steps, sleep_time, heart_rate) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(date), weight, calories_burned, steps, sleep_time, heart_rate),
+            )
+        added = cur.rowcount == 1
+        if added:
+            self._extend_stats(date, weight=weight, calories_burned=calories_burned, steps=steps,
+                               sleep_time=sleep_time, heart_rate=heart_rate)
+        return added
+
+    def has_date(self, date):
+        row = self._connect().execute("SELECT 1 FROM entries WHERE date = ?", (self._key(date),)).fetchone()
+        return row is not None
+
+    def delete_dates(self, dates):
+        """Remove the entries for `dates`; returns how many were deleted."""
+        with self._write() as conn:
+            cur = conn.executemany("DELETE FROM entries WHERE date = ?", [(self._key(d),) for d in dates])
+        return cur.rowcount
+
+    def entries(self):
+        """All entries as a DataFrame sorted by date (dates parsed)."""
+        frame = pd.read_sql_query(f"SELECT {', '.join(COLUMNS)} FROM entries ORDER BY date", self._connect())
+        frame["date"] = pd.to_datetime(frame["date"])
+        return frame
+
+    def import_frame(self, frame, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Bulk-insert a DataFrame with tracker columns, one transaction per
+        `batch_size` rows. Dates already stored are skipped; returns how
+        many rows were added.
+        """
+        if frame.empty or "date" not in frame:
+            return 0
+        frame = frame.reindex(columns=COLUMNS)
+        frame["date"] = pd.to_datetime(frame["date"], errors="coerce").dt.strftime("%Y-%m-%d")
+        frame = frame.dropna(subset=["date"])
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = list(frame[COLUMNS].itertuples(index=False, name=None))
+        added = 0
+        for start in range(0, len(rows), batch_size):
+            with self._write() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO entries (date, weight, calories_burned, steps, sleep_time, heart_rate) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows[start:start + batch_size],
+                )
+                added += conn.total_changes - before
+        return added
+
+    def import_csv(self, path, batch_size=IMPORT_BATCH_SIZE):
+        """Load a progress.csv-style file, skipping dates already stored."""
+        return self.import_frame(pd.read_csv(path), batch_size)
+
+    def __len__(self):
+        (n,) = self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()
+        return n
+
+    # ─── Statistics ─────────────────────────────────────────────────────────
+    def _version(self):
+        """(row count, last date): changes whenever any writer touches the table."""
+        return self._connect().execute("SELECT COUNT(*), MAX(date) FROM entries").fetchone()
+
+    def _extend_stats(self, date, **row):
+        # A newer day swaps in an extended copy of the cached stats; anything
+        # else drops them for a rebuild. Callers holding the old stats keep
+        # an unchanged snapshot.
+        with self._stats_lock:
+            if self._stats is None:
+                return
+            extended = self._stats.appended(date, row)
+            if extended is not None:
+                self._stats = extended
+                self._stats_key = (self._stats_key[0] + 1, self._key(date))
+            else:
+                self._stats = None
+
+    def stats(self):
+        """
+        TrackerStats snapshot for this store, rebuilt only when the entries
+        changed other than by appends through this object. Snapshots are
+        never modified, so they can be read without the store's lock.
+        """
+        version = self._version()
+        with self._stats_lock:
+            if self._stats is None or self._stats_key != version:
+                self._stats = TrackerStats.from_frame(self.entries())
+                self._stats_key = version
+            return self._stats
+
+
+# ─── Members ────────────────────────────────────────────────────────────────
+class UnknownMember(KeyError):
+    """Raised for a member id that was never registered."""
+
+
+class MemberRegistry:
+    """Registered member ids, in a small SQLite table next to the member stores."""
+
+    def __init__(self, root=USERS_DIR):
+        self.path = os.path.join(root, "members.db")
+        self._local = threading.local()
+        os.makedirs(root, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS members ("
+                "user_id TEXT PRIMARY KEY, created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            )
+            conn.execute("INSERT OR IGNORE INTO members (user_id) VALUES (?)", (DEFAULT_USER,))
+            # Row ids shown in each member's recent plans, one row per (kind, seed)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS selections ("
+                "user_id TEXT NOT NULL, kind TEXT NOT NULL, seed TEXT NOT NULL, "
+                "created REAL NOT NULL, rows TEXT NOT NULL, PRIMARY KEY (user_id, kind, seed))"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, user_id):
+        """Register a member; returns False if they already were."""
+        with self._connect() as conn:
+            cur = conn.execute("INSERT OR IGNORE INTO members (user_id) VALUES (?)", (user_id,))
+        return cur.rowcount == 1
+
+    def __contains__(self, user_id):
+        row = self._connect().execute("SELECT 1 FROM members WHERE user_id = ?", (user_id,)).fetchone()
+        return row is not None
+
+    def ids(self):
+        return [row[0] for row in self._connect().execute("SELECT user_id FROM members ORDER BY user_id")]
+
+    def recent_picks(self, user_id, kind, exclude_seed, plans, max_age):
+        """Row ids of the member's last `plans` plans of this kind drawn with another seed."""
+        cur = self._connect().execute(
+            "SELECT rows FROM selections WHERE user_id = ? AND kind = ? AND seed != ? AND created >= ? "
+            "ORDER BY created DESC LIMIT ?",
+            (user_id, kind, exclude_seed, time.time() - max_age, plans),
+        )
+        return {row for (rows,) in cur for row in json.loads(rows)}
+
+    def record_picks(self, user_id, kind, seed, rows, keep):
+        """
+        Store the rows of a plan drawn with `seed`, replacing the rows of an
+        earlier plan with that seed, and keep the member's newest `keep` plans.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO selections (user_id, kind, seed, created, rows) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, kind, seed) DO UPDATE SET rows = excluded.rows",
+                (user_id, kind, seed, time.time(), json.dumps([int(r) for r in rows])),
+            )
+            conn.execute(
+                "DELETE FROM selections WHERE user_id = ? AND kind = ? AND seed NOT IN ("
+                "SELECT seed FROM selections WHERE user_id = ? AND kind = ? ORDER BY created DESC LIMIT ?)",
+                (user_id, kind, user_id, kind, keep),
+            )
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def member_registry(root=USERS_DIR):
+    """The registry for the member stores under `root`, opened once per process."""
+    with _registries_lock:
+        registry = _registries.get(root)
+        if registry is None:
+            registry = _registries[root] = MemberRegistry(root)
+        return registry
+
+
+def register_member(user_id, root=USERS_DIR):
+    """Add a member so their tracker can be opened; returns False if already registered."""
+    user_id = str(user_id).strip()
+    user_store_path(user_id, root)  # validates the id
+    return member_registry(root).add(user_id)
+
+
+def member_exists(user_id, root=USERS_DIR):
+    """
+    True for registered members. Stores created before the registry existed
+    are registered the first time they are looked up.
+    """
+    user_id = str(user_id).strip()
+    if not user_id:
+        return False
+    registry = member_registry(root)
+    if user_id in registry:
+        return True
+    if os.path.isfile(user_store_path(user_id, root)):
+        registry.add(user_id)
+        return True
+    return False
+
+
+# ─── Member stores ──────────────────────────────────────────────────────────
+def user_store_path(user_id, root=USERS_DIR):
+    """
+    Database file of one member. Each member gets their own file, so reads
+    and writes for different members never share a lock or a page.
+    """
+    user_id = str(user_id).strip()
+    if not user_id:
+        raise ValueError("user_id must not be empty")
+    slug = re.sub(r"[^a-z0-9_-]+", "-", user_id.lower()).strip("-")[:40] or "user"
+    digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:10]
+    return os.path.join(root, f"{slug}-{digest}.db")
+
+
+# path -> TrackerStore, least recently used first
+_user_stores = OrderedDict()
+_user_stores_lock = threading.Lock()
+
+
+def open_user_store(user_id, root=USERS_DIR):
+    """
+    The store of a registered member, opened once per process (this is the
+    only cache of open stores; callers should not keep their own). At most
+    MAX_OPEN_STORES stay open; the least recently used is closed first.
+    Raises UnknownMember for ids that were never registered. The default
+    member is seeded from the old shared progress.db / progress.csv.
+    """
+    user_id = str(user_id).strip()
+    path = user_store_path(user_id, root)
+    if not member_exists(user_id, root):
+        raise UnknownMember(user_id)
+    with _user_stores_lock:
+        store = _user_stores.get(path)
+        if store is not None:
+            _user_stores.move_to_end(path)
+            return store
+        store = TrackerStore(path)
+        if user_id == DEFAULT_USER and len(store) == 0:
+            if os.path.isfile(TRACKER_DB):
+                store.import_frame(TrackerStore(TRACKER_DB).entries())
+            elif os.path.isfile(LEGACY_CSV):
+                store.import_csv(LEGACY_CSV)
+        _user_stores[path] = store
+        # An evicted store's connections close once no caller holds it
+        while len(_user_stores) > MAX_OPEN_STORES:
+            _user_stores.popitem(last=False)
+        return store
+
+
+def bulk_import(user_id, path, root=USERS_DIR, batch_size=IMPORT_BATCH_SIZE):
+    """Import a progress CSV into a registered member's store; returns rows added."""
+    return open_user_store(user_id, root).import_csv(path, batch_size)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+
+def _normalize(value):
+    return str(value).strip().lower()
+
+
+class WorkoutIndex:
+    """
+    Row-id partitions of the mega gym dataset keyed on lower-cased
+    (body_part, type), plus (body_part, None) for "any type".
+
+    The DataFrame is held once; lookups return int32 row positions into it.
+    """
+
+    def __init__(self, df):
+        self.data = df
+        self.partitions = {}
+        self.has_type = 'Type' in df.columns
+        if 'BodyPart' not in df.columns:
+            return
+        parts = df['BodyPart'].map(_normalize, na_action='ignore')
+        types = df['Type'].map(_normalize, na_action='ignore') if self.has_type else pd.Series(index=df.index, dtype=object)
+        positions = np.arange(len(df), dtype=np.int32)
+        keys = pd.DataFrame({'part': parts.to_numpy(), 'type': types.to_numpy()})
+        for part, rows in keys.groupby('part', sort=False).indices.items():
+            self.partitions[(part, None)] = positions[rows]
+        for (part, wtype), rows in keys.groupby(['part', 'type'], sort=False).indices.items():
+            self.partitions[(part, wtype)] = positions[rows]
+
+    def candidates(self, body_part, workout_type=None):
+        """Row positions for a body part, optionally restricted to a workout type."""
+        wtype = _normalize(workout_type) if workout_type and self.has_type else None
+        return self.partitions.get((_normalize(body_part), wtype), np.empty(0, dtype=np.int32))
+
+    def row(self, position):
+        return self.data.iloc[position]
+
+
+def build_workout_index(df):
+    """Build a WorkoutIndex over the mega gym DataFrame."""
+    return WorkoutIndex(df)
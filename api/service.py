@@ -0,0 +1,281 @@
+# Headless API over the analyses package. Run with, e.g.:
+#   uvicorn api.service:app --host 0.0.0.0 --port 8000 --workers 4
+import os
+import sys
+import math
+import datetime
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+# Add the parent directory to sys.path, as front_end/app.py does
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analyses.fatsecret_async import AsyncFatSecretClient
+from analyses.fatsecret_client import get_client
+from analyses.filter_data import filter_data
+from analyses.loaders import (
+    load_exercise_index,
+    load_exercises,
+    load_meal_optimizer,
+    load_program_builder,
+    load_workout_index,
+)
+from analyses.tracker_store import UnknownMember, open_user_store, register_member
+from analyses.plan_cache import get_plan, plan_cache
+from analyses.ai_chatbot import (
+    get_daily_meal_plan,
+    get_meal_plan,
+    get_weekly_program,
+    get_workout_plan,
+)
+
+FATSECRET_KEY = os.getenv("FATSECRET_KEY")
+FATSECRET_SECRET = os.getenv("FATSECRET_SECRET")
+
+
+# ─── Shared, read-only state (loaded once per worker process) ───────────────
+class Datasets:
+    exercises = None
+    exercise_index = None
+
+    @classmethod
+    def load(cls):
+        # analyses.loaders caches each of these for the life of the process
+        if cls.exercises is None:
+            cls.exercises = load_exercises()
+            cls.exercise_index = load_exercise_index()
+        load_workout_index()
+        load_program_builder()
+        load_meal_optimizer()
+
+
+_recipe_client = None
+
+
+def recipe_client():
+    """Async FatSecret client for this worker (its limits bind to the worker's loop)."""
+    global _recipe_client
+    if _recipe_client is None and FATSECRET_KEY and FATSECRET_SECRET:
+        _recipe_client = AsyncFatSecretClient(get_client(FATSECRET_KEY, FATSECRET_SECRET))
+    return _recipe_client
+
+
+@asynccontextmanager
+async def lifespan(app):
+    Datasets.load()
+    yield
+    if _recipe_client is not None:
+        await _recipe_client.aclose()
+
+
+app = FastAPI(title="Workout Recommender API", lifespan=lifespan)
+
+
+@app.exception_handler(UnknownMember)
+def unknown_member(request, exc):
+    return JSONResponse(status_code=404, content={"detail": f"Unknown member: {exc.args[0]}"})
+
+
+def jsonable(value):
+    """
+    numpy scalars -> Python, NaN / NaT -> None, dates -> ISO strings,
+    recursively through dicts and lists.
+    """
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    # Before .item(): a datetime64 would come back as an int (ns) or None
+    if isinstance(value, (pd.Timestamp, np.datetime64, datetime.date)) or value is pd.NaT:
+        return None if pd.isna(value) else pd.Timestamp(value).date().isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+# ─── Request bodies ─────────────────────────────────────────────────────────
+class FilterRequest(BaseModel):
+    calories_min: int = 0
+    calories_max: Optional[int] = None
+    difficulty: Optional[str] = None
+    equipment_include: List[str] = []
+    equipment_exclude: List[str] = []
+    muscle_group: List[str] = []
+    limit: int = Field(100, ge=1, le=1000)
+
+
+class Profile(BaseModel):
+    weight_lbs: float = Field(..., gt=0)
+    height_in: float = Field(..., gt=0)
+    age: int = Field(..., ge=10, le=120)
+    gender: str = "male"
+    activity_level: str = "moderate"
+    goal: str = "maintenance"
+
+
+class WorkoutRequest(BaseModel):
+    body_parts: Optional[str] = None
+    workout_type: Optional[str] = None
+    user_id: Optional[str] = None
+    seed: Optional[int] = None
+
+
+class PlanRequest(Profile):
+    body_parts: Optional[str] = None
+    workout_type: Optional[str] = None
+    user_id: Optional[str] = None
+    seed: Optional[int] = None
+
+
+class ProgramRequest(BaseModel):
+    days: int = Field(4, ge=1, le=7)
+    exercises_per_day: int = Field(6, ge=1, le=20)
+    difficulty: Optional[str] = None
+    equipment: Optional[List[str]] = None
+    workout_type: Optional[str] = None
+    seed: Optional[int] = None
+
+
+class MealRequest(BaseModel):
+    calories_target: float = Field(..., gt=0)
+    goal: str = "maintenance"
+    user_id: Optional[str] = None
+    seed: Optional[int] = None
+
+
+class RecipeRequest(BaseModel):
+    daily_calories: float = Field(..., gt=0)
+    window: int = Field(150, ge=0)
+    max_results: int = Field(5, ge=1, le=20)
+    details: bool = True
+
+
+class TrackerEntry(BaseModel):
+    date: datetime.date
+    weight: Optional[float] = None
+    calories_burned: Optional[float] = None
+    steps: Optional[int] = None
+    sleep_time: Optional[float] = None
+    heart_rate: Optional[float] = None
+
+
+# ─── Endpoints ──────────────────────────────────────────────────────────────
+# Plain `def` handlers run on FastAPI's thread pool, so slow numpy work in
+# one request does not block the event loop for the others.
+@app.get("/health")
+def health():
+    return {"status": "ok", "exercises_loaded": Datasets.exercises is not None, "plan_cache": plan_cache.stats()}
+
+
+@app.post("/workouts/filter")
+def workouts_filter(req: FilterRequest):
+    Datasets.load()
+    results = filter_data(
+        Datasets.exercises,
+        req.calories_min,
+        req.calories_max,
+        req.difficulty or "All",
+        req.equipment_include,
+        req.equipment_exclude,
+        req.muscle_group or "All",
+        index=Datasets.exercise_index,
+    )
+    return {"count": len(results), "results": jsonable(results.head(req.limit).to_dict("records"))}
+
+
+@app.post("/plans/workout")
+def plans_workout(req: WorkoutRequest):
+    return {"workouts": jsonable(get_workout_plan(req.body_parts, req.workout_type, req.user_id, req.seed))}
+
+
+@app.post("/plans/program")
+def plans_program(req: ProgramRequest):
+    return jsonable(get_weekly_program(req.days, req.exercises_per_day, req.difficulty,
+                                       req.equipment, req.workout_type, req.seed))
+
+
+@app.post("/plans/meals")
+def plans_meals(req: MealRequest):
+    return jsonable({
+        "meal": get_meal_plan(req.calories_target, req.goal, req.user_id, req.seed),
+        "daily": get_daily_meal_plan(req.calories_target, req.goal),
+    })
+
+
+@app.post("/plans/recipes")
+async def plans_recipes(req: RecipeRequest):
+    """
+    FatSecret recipes for breakfast, lunch and dinner of a daily target.
+    Awaited on the event loop: the searches and recipe lookups run
+    concurrently over the client's async connection pool, within its rate
+    limit.
+    """
+    client = recipe_client()
+    if client is None:
+        raise HTTPException(status_code=503, detail="FatSecret credentials are not configured")
+    meals = await client.meal_recipes(req.daily_calories, req.window, req.max_results, req.details)
+    return jsonable({"meals": meals})
+
+
+@app.post("/plans")
+def plans(req: PlanRequest):
+    """
+    The same plan the "AI Fitness Plan" tab builds: BMI, calories, workouts and meals.
+
+    Everything but the workouts comes from the shared plan cache; workouts
+    are drawn per request, avoiding the member's recent picks.
+    """
+    plan = get_plan(req.weight_lbs, req.height_in, req.age, req.gender, req.activity_level, req.goal,
+                    req.body_parts, req.workout_type, user_id=req.user_id, seed=req.seed)
+    plan["bmi"] = round(plan["bmi"], 1)
+    return jsonable(plan)
+
+
+@app.post("/members/{user_id}")
+def members_add(user_id: str):
+    """Register a member so their tracker endpoints can be used."""
+    try:
+        created = register_member(user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return JSONResponse(status_code=201 if created else 200, content={"user_id": user_id.strip(), "created": created})
+
+
+@app.get("/tracker/{user_id}/entries")
+def tracker_entries(user_id: str):
+    return {"entries": jsonable(open_user_store(user_id).stats().frame().to_dict("records"))}
+
+
+@app.post("/tracker/{user_id}/entries", status_code=201)
+def tracker_add(user_id: str, entry: TrackerEntry):
+    date = entry.date.isoformat()
+    added = open_user_store(user_id).add_entry(pd.Timestamp(entry.date), entry.weight, entry.calories_burned,
+                                               entry.steps, entry.sleep_time, entry.heart_rate)
+    if not added:
+        raise HTTPException(status_code=409, detail=f"An entry for {date} already exists")
+    return {"date": date}
+
+
+@app.delete("/tracker/{user_id}/entries/{date}")
+def tracker_delete(user_id: str, date: datetime.date):
+    deleted = open_user_store(user_id).delete_dates([pd.Timestamp(date)])
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"No entry for {date}")
+    return {"deleted": deleted}
+
+
+@app.get("/tracker/{user_id}/stats")
+def tracker_stats(user_id: str, weekly: bool = False):
+    stats = open_user_store(user_id).stats()
+    out = {"entries": len(stats), "summary": stats.summary()}
+    if weekly:
+        out["weekly"] = stats.weekly().to_dict("records")
+    return jsonable(out)
@@ -1,11 +1,9 @@
 import sys
 import os, datetime
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import time
+import uuid
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import random
 
 
 
@@ -16,37 +14,56 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # Get the absolute path to the CSV file
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 csv_path = os.path.join(BASE_DIR, "../data/processed/exercises_cleaned.csv")
-progress_file = os.path.join(BASE_DIR, "../data/user/progress.csv")
-os.makedirs(os.path.dirname(progress_file), exist_ok=True)
-if not os.path.isfile(progress_file):
-    pd.DataFrame(columns=["date", "weight"]).to_csv(progress_file, index=False)
-df = pd.read_csv(csv_path)
-
-df["Burns Calories"] = pd.to_numeric(df["Burns Calories"], errors="coerce")
-
-from analyses.filter_data import filter_data
-from analyses.nutrition_search import search_foods
-from analyses.recipe_search import search_recipes_by_calories
-from analyses.ai_chatbot import (
-    get_workout_plan,
-    calculate_daily_calories,
-    get_meal_plan,
-    calculate_bmi,
-)
+
+from analyses.startup_profile import StartupProfile
 # from analyses.chatbot3 import load_chatbot, get_chatbot_response
 
+# Heavy modules (plotly, sklearn via ai_chatbot, the FatSecret clients) and
+# datasets are imported / loaded inside the page that needs them, the first
+# time that page is opened. Each of those steps is timed into the profile.
+@st.cache_resource
+def get_startup_profile():
+    """Startup timings for this process (shown with ?profile=1)."""
+    return StartupProfile()
+
+profile = get_startup_profile()
+
+@st.cache_resource
+def load_exercises():
+    """
+    The cleaned exercises dataset, loaded once per process by
+    analyses.loaders (shared with the API), so the cached exercise index
+    stays bound to this frame.
+    """
+    loaders = profile.import_module("analyses.loaders")
+    with profile.phase("exercises_cleaned.csv"):
+        return loaders.load_exercises()
+
+@st.cache_resource
+def load_exercise_index():
+    """Build the equipment / muscle-group index once per process."""
+    loaders = profile.import_module("analyses.loaders")
+    load_exercises()
+    with profile.phase("exercise index"):
+        return loaders.load_exercise_index()
+
 st.title("Personal Health Assistant")
 
 
-# Create tabs for the main interface and chat
-tab1, tab2, tab3, tab4 = st.tabs([
-    "Workout Finder",
-    "Nutrition Calculator",
-    "AI Fitness Plan",
-    "Personal Tracker"
-])
+def session_member():
+    """
+    The member id this browser session acts as: the `user` query parameter,
+    or an id generated once per session. Never taken from page inputs.
+    """
+    user = (st.query_params.get("user") or "").strip()
+    return user or st.session_state.setdefault("session_user", uuid.uuid4().hex)
+
+
+def workout_finder_page():
+    filter_data = profile.import_module("analyses.filter_data").filter_data
+    df = load_exercises()
+    exercise_index = load_exercise_index()
 
-with tab1:
     st.header("Exercise Recommender")
     # Sort equipment options alphabetically, keeping 'None' at the beginning
     equipment_options = sorted(['Parallel Bars', 'Chairs', 'Pull-up Bar', 'Dumbbell', 'Barbell',
@@ -87,7 +104,8 @@ with tab1:
             difficulty,
             equipment_include,
             equipment_exclude,
-            muscle_group
+            muscle_group,
+            index=exercise_index,
         )
         if not results.empty:
             st.write("Recommended Workouts:")
@@ -99,23 +117,25 @@ with tab1:
 # # Calorie Advice API Section
 # # -------------------------
 
-with tab2:
+def nutrition_page():
+    food_pages = profile.import_module("analyses.nutrition_search").food_pages
+
     st.header("Nutrition Calculator")
 
     # 1) Input & Search Trigger
     food_query = st.text_input("Enter a food name to search:", key="food_query")
+    PAGE_SIZE = 5
     if st.button("Search Foods", key="search"):
-        st.session_state.results = search_foods(food_query)
+        # Pages are fetched lazily; the next one loads in the background
+        st.session_state.results = food_pages(food_query, PAGE_SIZE)
         st.session_state.page_index = 0
         st.session_state.query = food_query
 
     # 2) Render & Paginate (outside of the search-button `if`)
-    if "results" in st.session_state and st.session_state.results:
+    if "results" in st.session_state and st.session_state.results.num_pages:
         st.subheader(f'Search Results for "{st.session_state.query}"')
         results = st.session_state.results
-        total = len(results)
-        PAGE_SIZE = 5
-        num_pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+        num_pages = results.num_pages
 
         # safety init
         if "page_index" not in st.session_state:
@@ -132,46 +152,53 @@ with tab2:
         with mid_col:
             st.write(f"Page {st.session_state.page_index+1} of {num_pages}")
 
-        # slice for current page
-        start = st.session_state.page_index * PAGE_SIZE
-        end = start + PAGE_SIZE
-        page_results = results[start:end]
+        # fetch (or reuse the prefetched) current page
+        page_results = results.page(st.session_state.page_index)
+        if results.is_fallback(st.session_state.page_index):
+            st.caption("FatSecret did not answer in time; showing matches from offline data.")
 
-        
+        # Records are already parsed, so sorting needs no string work
+        sort_key = st.selectbox("Sort by", ["Relevance", "calories", "protein", "fat", "carbs"], key="food_sort")
+        if sort_key != "Relevance":
+            # Most protein first; least calories / fat / carbs first; unknowns last
+            page_results = sorted(
+                page_results,
+                key=lambda f: (f[sort_key] is None, -(f[sort_key] or 0) if sort_key == "protein" else (f[sort_key] or 0)),
+            )
 
-        # Render each result as before
         for food in page_results:
-            name = food.get("food_name", "")
-            url = food.get("food_url", "#")
-            info_string = food.get("food_description", "")
-
-            if " - " in info_string:
-                weight_info, macros_part = info_string.split(" - ", 1)
-            else:
-                weight_info, macros_part = None, info_string
-
-            macros = {}
-            for chunk in macros_part.split("|"):
-                if ":" in chunk:
-                    label, val = chunk.split(":", 1)
-                    macros[label.strip()] = val.strip()
-
-            with st.expander(name):
-                if weight_info:
-                    st.caption(weight_info)
+            with st.expander(food["food_name"]):
+                if food["serving"]:
+                    st.caption(food["serving"])
                 cols = st.columns(4)
-                for col, key in zip(cols, ["Calories", "Fat", "Carbs", "Protein"]):
-                    val = macros.get(key, "—")
-                    if key == "Calories" and val.endswith("kcal"):
-                        val = val[:-4].strip() + " kcal"
-                    col.metric(label=key, value=val)
-                st.markdown(f"[More info ➞]({url})", unsafe_allow_html=True)
+                for col, (label, key, unit) in zip(cols, [
+                    ("Calories", "calories", " kcal"), ("Fat", "fat", "g"), ("Carbs", "carbs", "g"), ("Protein", "protein", "g"),
+                ]):
+                    val = food[key]
+                    col.metric(label=label, value="—" if val is None else f"{val:g}{unit}")
+                if food["food_url"]:
+                    st.markdown(f"[More info ➞]({food['food_url']})", unsafe_allow_html=True)
 
         st.markdown("---")
 
  
-with tab4:
+def tracker_page():
+    px = profile.import_module("plotly.express")
+    import_export = profile.import_module("analyses.tracker_import").import_export
+    tracker_store = profile.import_module("analyses.tracker_store")
+
     st.header("Personal Tracker")
+    # Each member's entries live in their own partition; a session only
+    # ever opens its own member's
+    member_id = session_member()
+    if not tracker_store.member_exists(member_id):
+        st.info("There is no tracker for this session's member yet.")
+        if st.button("Create tracker", key="create_member"):
+            tracker_store.register_member(member_id)
+            st.rerun()
+        return
+    # Stores are opened once per process by tracker_store itself
+    tracker = tracker_store.open_user_store(member_id)
     # New Entry Form 
     with st.form("progress_form"):
         date = st.date_input("Date", value=datetime.date.today())
@@ -182,22 +209,16 @@ with tab4:
         submitted = st.form_submit_button("Add Entry")
 
     if submitted:
-        # Load existing entries
-        df_progress = pd.read_csv(progress_file)
-        # Check for duplicate date
-        existing_dates = set(df_progress["date"])
-        if date.isoformat() in existing_dates:
-            st.warning(f"You already entered data for {date.strftime('%m/%d/%Y')}.")
-        else:
-            # Append new entry
-            df_progress.loc[len(df_progress)] = [date.isoformat(), weight, calories_burned, steps, sleep_time]
-            df_progress.to_csv(progress_file, index=False)
+        # The date index rejects duplicates; no need to read the history
+        if tracker.add_entry(date, weight, calories_burned, steps, sleep_time):
             st.success("Entry added!")
+        else:
+            st.warning(f"You already entered data for {date.strftime('%m/%d/%Y')}.")
 
      # ─ load and prepare data ─────────────────────────────────────────────────
-    df_progress = pd.read_csv(progress_file)
-    df_progress["date"] = pd.to_datetime(df_progress["date"])
-    df_progress = df_progress.sort_values("date").reset_index(drop=True)
+    # Stats are cached per member and extended in place on each new entry
+    stats = tracker.stats()
+    df_progress = stats.frame()
 
      # — Prepare Display DataFrame —
     display_df = pd.DataFrame({
@@ -206,6 +227,7 @@ with tab4:
         "Calories Burned": df_progress["calories_burned"],
         "Steps": df_progress["steps"],
         "Sleep Duration": df_progress["sleep_time"],
+        "Heart Rate": df_progress["heart_rate"],
     })
 
     st.subheader("Progress Data")
@@ -213,37 +235,33 @@ with tab4:
 
     # — Inline Deletion Controls —
     st.markdown("**Select rows to delete:**")
-    # Build options by zipping the two series
-    options = [
-        f"{d} — {w} lbs"
-        for d, w, c, s, t in zip(display_df["Date"], display_df["Weight (lbs)"], display_df["Calories Burned"], display_df["Steps"], display_df["Sleep Duration"])
-    ]
-    to_delete = st.multiselect("Entries to remove", options)
+    labels = {
+        f"{d} — {w} lbs": day
+        for d, w, day in zip(display_df["Date"], display_df["Weight (lbs)"], df_progress["date"])
+    }
+    to_delete = st.multiselect("Entries to remove", list(labels))
 
     if st.button("Delete Selected") and to_delete:
-        # Construct a boolean mask: keep rows whose label is NOT in to_delete
-        keep_mask = [
-            f"{d} — {w} lbs" not in to_delete
-            for d, w in zip(display_df["Date"], display_df["Weight (lbs)"])
-        ]
-        # Apply mask to original df_progress
-        df_progress = df_progress[keep_mask].reset_index(drop=True)
-        df_progress.to_csv(progress_file, index=False)
+        tracker.delete_dates([labels[label] for label in to_delete])
         st.success(f"Deleted {len(to_delete)} entr{'y' if len(to_delete)==1 else 'ies'}.")
         st.rerun()
 
-        # Reload and re-display
-        df_progress["date"] = pd.to_datetime(df_progress["date"])
-        df_progress = df_progress.sort_values("date").reset_index(drop=True)
-        display_df = pd.DataFrame({
-            "Date": df_progress["date"].dt.strftime("%m/%d/%Y"),
-            "Weight (lbs)": df_progress["weight"],
-            "Calories Burned": df_progress["calories_burned"],
-            "Steps": df_progress["steps"],
-            "Sleep Duration": df_progress["sleep_time"]
-        })
-        st.dataframe(display_df, use_container_width=True)
-    values = ["date", "weight", "calories_burned", "steps", "sleep_time"]
+    # — Bulk Import —
+    upload = st.file_uploader("Import a tracker or wearable export (CSV)", type="csv", key="progress_upload")
+    if upload is not None:
+        if st.button("Import", key="import_progress"):
+            try:
+                result = import_export(tracker, upload, user_id=member_id)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                message = f"Imported {result['added']} new entries ({result['skipped']} already present or duplicate)."
+                if result["rejected"]:
+                    message += f" Rejected {result['rejected']} dated after today."
+                st.success(message)
+                st.rerun()
+
+    values = ["date", "weight", "calories_burned", "steps", "sleep_time", "heart_rate"]
     x_metric = st.selectbox(
         "Select the x value:",
         values
@@ -253,7 +271,21 @@ with tab4:
         "Select the y value:",
         values
     )
-    if not df_progress.empty:
+    if not df_progress.empty and x_metric == "date":
+        smoothing = st.radio("Smoothing", ["Daily", "7-day average", "30-day average"], horizontal=True)
+        window = {"Daily": None, "7-day average": 7, "30-day average": 30}[smoothing]
+        # Downsampled (LTTB) so years of history still plot quickly
+        dates, series = stats.series(y_metric, window=window, max_points=500)
+        fig = px.line(
+            pd.DataFrame({"date": dates, y_metric: series}),
+            x="date",
+            y=y_metric,
+            title=f"{y_metric.capitalize()} Over Date",
+            markers=len(series) <= 60,
+            labels={"date": "Date", y_metric: y_metric.capitalize()}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    elif not df_progress.empty:
         fig = px.line(
             df_progress,
             x=x_metric,
@@ -264,11 +296,33 @@ with tab4:
         )
         st.plotly_chart(fig, use_container_width=True)
 
+    if not df_progress.empty:
+        st.subheader("Rolling Averages")
+        summary = stats.summary()
+        cols = st.columns(3)
+        for col, (metric, label) in zip(cols, [("weight", "Weight (lbs)"), ("steps", "Steps"), ("sleep_time", "Sleep (hr)")]):
+            row = summary[metric]
+            if row["mean_7d"] is None:
+                col.metric(f"{label}, 7-day", "—")
+                continue
+            trend = row["trend_per_week"]
+            col.metric(
+                f"{label}, 7-day",
+                f"{row['mean_7d']:,.1f}",
+                delta=None if trend is None else f"{trend:+.1f}/week (30-day trend)",
+            )
+            if row["mean_30d"] is not None:
+                col.caption(f"30-day average: {row['mean_30d']:,.1f}")
+        with st.expander("Weekly summary"):
+            st.dataframe(stats.weekly().sort_values("week", ascending=False), use_container_width=True)
+
+
 
 
 
+def fitness_plan_page():
+    get_plan = profile.import_module("analyses.plan_cache").get_plan
 
-with tab3:
     st.header("AI Fitness Plan")
 
     st.markdown("Fill in your details to get a personalized workout & meal plan:")
@@ -308,19 +362,22 @@ with tab3:
     workout_type = st.selectbox("Workout Type:", ['Strength', 'Plyometrics', 'Cardio', 'Stretching', 'Powerlifting', 
     'Strongman', 'Olympic Weightlifting'])
 
+    variation = st.number_input("Plan variation", min_value=0, step=1, value=0,
+                                help="Change it for a different selection of workouts.")
+
     # 3) Trigger
     if st.button("Generate Plan", key="gen"):
-        bmi = calculate_bmi(weight_lbs, height_in)
-        daily_cals = calculate_daily_calories(
-        weight_lbs, height_in, age, gender, activity_level, bmi
-        )
-        plans = get_workout_plan(body_parts, workout_type)
-        meal_info = get_meal_plan(daily_cals, goal)
-
-        st.session_state.bmi         = bmi
-        st.session_state.daily_cals  = daily_cals
-        st.session_state.plans       = plans
-        st.session_state.meal_info   = meal_info
+        # BMI, calories and meals are shared across sessions (see analyses/plan_cache.py);
+        # workouts are drawn for this member, avoiding their recent picks
+        user_id = session_member()
+        plan = get_plan(weight_lbs, height_in, age, gender, activity_level, goal,
+                        body_parts, workout_type, user_id=user_id, seed=variation)
+
+        st.session_state.bmi         = plan["bmi"]
+        st.session_state.daily_cals  = plan["daily_calories"]
+        st.session_state.plans       = plan["workouts"]
+        st.session_state.session_cals = plan["session_calories"]
+        st.session_state.daily_meals = plan["daily_meals"]
         # clear any previous recipe search
         st.session_state.pop("recipes", None)
 
@@ -330,6 +387,9 @@ with tab3:
         st.metric("Daily Calorie Target", f"{st.session_state.daily_cals} kcal")
 
         st.subheader("🏋️ Workout Plan")
+        if st.session_state.get("session_cals"):
+            st.caption(f"A 45-minute session like this burns about {st.session_state.session_cals} kcal "
+                       "(average across the fitness tracker cohort).")
         for i, p in enumerate(st.session_state.plans, 1):
             if p.get("message"):
                 st.info(p["message"])
@@ -341,6 +401,21 @@ with tab3:
                 if pd.notna(desc) and desc.strip():
                     st.write(desc)
 
+        st.subheader("🍽️ Daily Meal Plan")
+        daily_meals = st.session_state.get("daily_meals")
+        if daily_meals and daily_meals["items"]:
+            st.dataframe(pd.DataFrame(daily_meals["items"]), use_container_width=True)
+            totals = daily_meals["totals"]
+            cols = st.columns(4)
+            for col, key in zip(cols, ["calories", "protein", "fat", "carbs"]):
+                unit = " kcal" if key == "calories" else " g"
+                col.metric(label=key.capitalize(), value=f"{totals[key]:.0f}{unit}")
+            if not daily_meals["feasible"]:
+                st.warning("No combination meets every target; this is the closest one found. "
+                           f"Outside target: {', '.join(daily_meals['missed'])}.")
+        else:
+            st.info("No meal combination found for that calorie target.")
+
         # # 6) Recipe‑Based Meal Plan
         # st.subheader("🍽️ Recipe Plan")
 
@@ -378,4 +453,21 @@ with tab3:
         #     # if details.get("nutrition"):
         #     #     st.markdown("**Nutrition per serving:**")
         #     #     for nut, val in details["nutrition"].items():
-        #     #         st.write(f"- {nut}: {val}")
\ No newline at end of file
+        #     #         st.write(f"- {nut}: {val}")
+
+
+# Only the selected page runs on each rerun (st.tabs would run all four)
+PAGES = {
+    "Workout Finder": workout_finder_page,
+    "Nutrition Calculator": nutrition_page,
+    "AI Fitness Plan": fitness_plan_page,
+    "Personal Tracker": tracker_page,
+}
+page = st.sidebar.radio("Navigate", list(PAGES), key="page")
+with profile.phase(f"first render: {page}", kind="page"):
+    PAGES[page]()
+
+if st.query_params.get("profile") == "1":
+    with st.sidebar.expander("Startup profile", expanded=True):
+        st.caption(f"Process up for {time.perf_counter() - profile.started:.1f}s")
+        st.dataframe(profile.report(), use_container_width=True)
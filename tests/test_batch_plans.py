@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyses import ai_chatbot
+from analyses.batch_plans import generate_plans
+from analyses.sampling import SelectionHistory
+
+
+@pytest.fixture(autouse=True)
+def history(monkeypatch, tmp_path):
+    monkeypatch.setattr(ai_chatbot, "selection_history", SelectionHistory(root=str(tmp_path)))
+
+
+def profiles(**overrides):
+    rows = {
+        "user_id": ["ann", "bob", "cy"],
+        "weight_lbs": [150, 200, 130],
+        "height_in": [66, 70, 62],
+        "age": [30, 45, 25],
+        "gender": ["male", "male", "female"],
+        "activity_level": ["moderate", "light", "active"],
+        "goal": ["fat loss", "fat loss", "muscle gain"],
+        "body_parts": ["Chest and Biceps", "Chest and Biceps", "Quadriceps"],
+        "workout_type": ["Strength", "Strength", "Strength"],
+    }
+    rows.update(overrides)
+    return pd.DataFrame(rows)
+
+
+def test_batch_plans_match_interactive_plans():
+    result = generate_plans(profiles(), seed=3)
+    for row in result.itertuples():
+        assert row.workout_plan == ai_chatbot.get_workout_plan(row.body_parts, row.workout_type, row.user_id, 3)
+        assert row.meal_plan == ai_chatbot.get_meal_plan(row.daily_calories, row.goal, row.user_id, 3)
+        assert row.daily_calories == ai_chatbot.calculate_daily_calories(
+            row.weight_lbs, row.height_in, row.age, row.gender, row.activity_level, row.bmi)
+
+
+def test_rows_without_numbers_are_rejected():
+    with pytest.raises(ValueError, match=r"rows \[1\]"):
+        generate_plans(profiles(height_in=[66, np.nan, 62]))
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from analyses.cohort_stats import USECOLS, load_cohort_summary, summarize_tracker
+
+
+def tracker_file(tmp_path, rows):
+    path = tmp_path / "tracker.csv"
+    pd.DataFrame(rows, columns=USECOLS).to_csv(path, index=False)
+    return str(path)
+
+
+def test_empty_file_gives_empty_tables(tmp_path):
+    tables = summarize_tracker(tracker_file(tmp_path, []))
+    assert all(table.empty for table in tables.values())
+    assert list(tables["vo2_percentiles"].columns[:3]) == ["age_band", "gender", "n"]
+
+
+def test_rows_without_age_are_not_counted(tmp_path):
+    rows = [
+        [30, "Male", "Cardio", "High", 30, 300, 40.0, 20.0, "Happy", "Happy"],
+        [np.nan, "Male", "Cardio", "High", 30, 300, 45.0, 25.0, "Happy", "Happy"],
+    ]
+    vo2 = summarize_tracker(tracker_file(tmp_path, rows))["vo2_percentiles"]
+    assert vo2[["age_band", "gender", "n"]].values.tolist() == [["25-34", "Male", 1]]
+
+
+def test_summary_cache_leaves_no_temp_files(tmp_path):
+    path = tracker_file(tmp_path, [[30, "Male", "Cardio", "High", 30, 300, 40.0, 20.0, "Happy", "Happy"]])
+    cache_dir = tmp_path / "cache"
+    first = load_cohort_summary(path, cache_dir=str(cache_dir))
+    again = load_cohort_summary(path, cache_dir=str(cache_dir))
+    assert [p.name for p in cache_dir.iterdir()] == ["cohort_summary.pkl"]
+    pd.testing.assert_frame_equal(first["calorie_rates"], again["calorie_rates"])
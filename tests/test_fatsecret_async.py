@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from analyses.fatsecret_async import AsyncFatSecretClient
+from analyses.fatsecret_client import FatSecretClient
+from analyses.meal_optimizer import MEAL_SHARES
+
+DELAY = 0.2  # seconds each mock response takes
+
+
+class MockFatSecret(BaseHTTPRequestHandler):
+    """server.api stand-in: answers by `method`, after DELAY, and fails the first `failures` requests."""
+
+    def do_POST(self):
+        server = self.server
+        form = urllib.parse.parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        params = {k: v[0] for k, v in form.items()}
+        with server.lock:
+            server.requests.append(params)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            fail = server.failures > 0
+            server.failures -= fail
+        time.sleep(DELAY)
+        with server.lock:
+            server.active -= 1
+        if fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if params["method"] == "foods.search":
+            body = {"foods": {"food": [{"food_id": "1", "food_name": params["search_expression"]}],
+                              "total_results": "1"}}
+        elif params["method"] == "recipes.search.v3":
+            lo = params["calories.from"]
+            body = {"recipes": {"recipe": {"recipe_id": lo, "recipe_name": f"from {lo}", "recipe_url": "u"}}}
+        else:
+            body = {"recipe": {"recipe_id": params["recipe_id"]}}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockFatSecret)
+    server.lock = threading.Lock()
+    server.requests, server.active, server.peak, server.failures = [], 0, 0, 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client_for(server, **kwargs):
+    sync = FatSecretClient("demo-key", "demo-secret", base_url=f"http://127.0.0.1:{server.server_port}/")
+    return AsyncFatSecretClient(sync, **kwargs)
+
+
+def run(client, coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_searches_overlap_on_the_event_loop(server):
+    client = client_for(server, max_concurrency=8, rate=100)
+    queries = [f"food {i}" for i in range(8)]
+    start = time.monotonic()
+    found = run(client, client.search_many_foods(queries))
+    elapsed = time.monotonic() - start
+
+    assert {q: foods[0]["food_name"] for q, foods in found.items()} == {q: q for q in queries}
+    assert server.peak == 8
+    assert elapsed < 4 * DELAY
+    assert all(r["oauth_signature"] and r["oauth_consumer_key"] == "demo-key" for r in server.requests)
+
+
+def test_concurrency_limit_is_respected(server):
+    client = client_for(server, max_concurrency=2, rate=100)
+    run(client, client.search_many_foods([f"food {i}" for i in range(6)]))
+    assert server.peak == 2
+
+
+def test_meal_recipes_use_the_meal_shares_and_retry(server):
+    server.failures = 1
+    client = client_for(server, rate=100, backoff_factor=0.01)
+    plan = run(client, client.meal_recipes(2000, window=100, details=True))
+
+    assert list(plan) == list(MEAL_SHARES)
+    for meal, share in MEAL_SHARES.items():
+        (recipe,) = plan[meal]
+        assert recipe["id"] == str(int(2000 * share - 100))
+        assert recipe["details"] == {"recipe_id": recipe["id"]}
+    # Three searches, one retried, then three recipe.get calls
+    assert len(server.requests) == 7
@@ -0,0 +1,87 @@
+from unittest import mock
+
+from analyses import fatsecret_client
+from analyses.fatsecret_client import SERVER_API_URL, FatSecretClient, get_client
+
+# Reference signature for the request below, computed independently with
+# oauthlib (normalize_parameters / signature_base_string / sign_hmac_sha1)
+TIMESTAMP = 1700000000
+NONCE = "0123456789abcdef0123456789abcdef"
+EXPECTED_SIGNATURE = "1kNm+i2rcapxACoCf1xUoiDV3nc="
+
+
+class StubResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class StubSession:
+    """Records each request instead of sending it."""
+
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def post(self, url, data=None, timeout=None):
+        self.calls.append(("POST", url, data))
+        return StubResponse(self.body)
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(("GET", url, params))
+        return StubResponse(self.body)
+
+    def close(self):
+        pass
+
+
+def fixed_clock():
+    return (
+        mock.patch.object(fatsecret_client.time, "time", return_value=TIMESTAMP),
+        mock.patch.object(fatsecret_client.uuid, "uuid4", return_value=mock.Mock(hex=NONCE)),
+    )
+
+
+def test_foods_search_sends_known_oauth1_signature():
+    body = {"foods": {"food": {"food_id": "1", "food_name": "Chicken"}, "total_results": "1"}}
+    session = StubSession(body)
+    client = FatSecretClient("demo-key", "demo-secret", session=session)
+    clock, nonce = fixed_clock()
+    with clock, nonce:
+        foods, total = client.foods_search("chicken breast & rice")
+
+    method, url, data = session.calls[0]
+    assert (method, url) == ("POST", SERVER_API_URL)
+    assert data["oauth_signature"] == EXPECTED_SIGNATURE
+    assert data["oauth_timestamp"] == str(TIMESTAMP)
+    assert data["oauth_nonce"] == NONCE
+    assert data["search_expression"] == "chicken breast & rice"
+    assert foods == [{"food_id": "1", "food_name": "Chicken"}]
+    assert total == 1
+
+
+def test_signature_changes_with_the_secret():
+    params = {"method": "foods.search", "format": "json", "search_expression": "chicken breast & rice",
+              "page_number": 0, "max_results": 20}
+    clock, nonce = fixed_clock()
+    with clock, nonce:
+        other = FatSecretClient("demo-key", "other-secret", session=StubSession({}))
+        signed = other.signed_params("POST", SERVER_API_URL, params)
+    assert signed["oauth_signature"] != EXPECTED_SIGNATURE
+
+
+def test_get_client_is_keyed_on_credentials():
+    with mock.patch.object(fatsecret_client, "_clients", {}):
+        first = get_client("key-a", "secret-a")
+        assert get_client("key-a", "secret-a") is first
+        second = get_client("key-b", "secret-b")
+        assert second is not first
+        assert second.consumer_key == "key-b"
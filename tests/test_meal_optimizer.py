@@ -0,0 +1,29 @@
+import pytest
+
+from analyses.ai_chatbot import get_daily_meal_plan
+from analyses.meal_optimizer import CALORIE_TOLERANCE, daily_targets
+
+
+def test_every_macro_has_a_band():
+    targets = daily_targets(2000, 0.35, 0.30, 0.35)
+    for macro in ("protein", "fat", "carbs"):
+        lo, hi = targets[macro]
+        assert 0 < lo < hi
+    assert targets["protein"] == pytest.approx((175, 225))
+
+
+@pytest.mark.parametrize("goal", ["fat loss", "muscle gain", "maintenance"])
+def test_feasible_plans_stay_inside_every_band(goal):
+    feasible = 0
+    for kcal in (1600, 2000, 2400, 2800):
+        plan = get_daily_meal_plan(kcal, goal, time_budget=0.2)
+        totals, targets = plan["totals"], plan["targets"]
+        assert plan["feasible"] == (not plan["missed"])
+        if not plan["feasible"]:
+            continue
+        feasible += 1
+        assert abs(totals["calories"] - kcal) <= CALORIE_TOLERANCE * kcal + 0.1
+        for macro in ("protein", "fat", "carbs"):
+            lo, hi = targets[macro]
+            assert lo - 0.1 <= totals[macro] <= hi + 0.1, macro
+    assert feasible
@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+from analyses import nutrition_search
+from analyses.search_cache import TTLCache, TieredCache
+
+
+class HungFatSecret:
+    """foods_search blocks until released, like FatSecret during an outage."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def foods_search(self, query):
+        self.calls += 1
+        self.release.wait(10)
+        return []
+
+
+@pytest.fixture
+def outage(monkeypatch):
+    hung = HungFatSecret()
+    monkeypatch.setattr(nutrition_search, "get_fatsecret", lambda: hung)
+    monkeypatch.setattr(nutrition_search, "food_search_cache", TieredCache(TTLCache()))
+    monkeypatch.setattr(nutrition_search, "local_foods", lambda query: [{"food_name": query, "source": "local"}])
+    yield hung
+    hung.release.set()
+
+
+def test_cached_queries_are_served_while_remote_calls_hang(outage):
+    cached = [{"food_name": "apple", "source": "fatsecret"}]
+    nutrition_search.food_search_cache.set("foods|apple", cached)
+
+    # Fill every remote slot with a hung call
+    for i in range(nutrition_search.FOOD_SEARCH_MAX_IN_FLIGHT):
+        assert nutrition_search.search_foods(f"pear {i}", budget=0.05)[0]["source"] == "local"
+
+    start = time.monotonic()
+    assert nutrition_search.search_foods("apple", budget=5) == cached
+    # A further miss is answered locally at once instead of queueing
+    assert nutrition_search.search_foods("plum", budget=5)[0]["source"] == "local"
+    assert time.monotonic() - start < 1
+    assert outage.calls == nutrition_search.FOOD_SEARCH_MAX_IN_FLIGHT
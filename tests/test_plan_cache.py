@@ -0,0 +1,14 @@
+from analyses.plan_cache import PlanCache
+
+
+def test_dataset_change_reloads_and_rebuilds():
+    version, reloads = ["v1"], []
+    cache = PlanCache(version=lambda: version[0], check_interval=0, reload=lambda: reloads.append(version[0]))
+    build = lambda: {"data": version[0]}
+
+    assert cache.get_or_build("key", build) == {"data": "v1"}
+    assert cache.get_or_build("key", build) == {"data": "v1"}
+    version[0] = "v2"
+    assert cache.get_or_build("key", build) == {"data": "v2"}
+    assert reloads == ["v2"]
+    assert cache.stats()["builds"] == 2 and cache.stats()["invalidations"] == 1
@@ -0,0 +1,31 @@
+import pytest
+
+from analyses import ai_chatbot
+from analyses.sampling import SelectionHistory
+
+
+@pytest.fixture
+def history(monkeypatch, tmp_path):
+    history = SelectionHistory(root=str(tmp_path))
+    monkeypatch.setattr(ai_chatbot, "selection_history", history)
+    return history
+
+
+def titles(plan):
+    return [w["title"] for w in plan]
+
+
+def test_same_member_and_seed_give_the_same_plan(history):
+    first = ai_chatbot.get_workout_plan("Chest and Biceps", "Strength", user_id="m1", seed=1)
+    assert ai_chatbot.get_workout_plan("Chest and Biceps", "Strength", user_id="m1", seed=1) == first
+    # The history is read back from disk, not from this process's memory
+    assert SelectionHistory(root=history.root).recent("m1", "workout", seed=2)
+
+
+def test_other_seeds_avoid_recent_picks(history):
+    shown = set()
+    for seed in range(3):
+        plan = titles(ai_chatbot.get_workout_plan("Chest and Biceps", "Strength", user_id="m1", seed=seed))
+        assert not shown & set(plan)
+        shown.update(plan)
+    assert len(history.recent("m1", "workout", seed=99)) == 6
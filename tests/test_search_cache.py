@@ -0,0 +1,144 @@
+import threading
+import time
+
+from analyses import search_cache
+from analyses.search_cache import SingleFlight, SQLiteCache, TieredCache, TTLCache, cached_call
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(search_cache.time, "monotonic", clock)
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+
+    clock.now += 10
+    assert cache.get("a") == 1
+    clock.now += 0.1
+    assert cache.get("a") is None and cache.get("b") == 2
+    clock.now += 20
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 0, "hits": 2, "misses": 2, "expired": 2}
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_values_are_copied_in_and_out():
+    cache = TTLCache()
+    value = {"items": [1]}
+    cache.set("k", value)
+    value["items"].append(2)
+    cache.get("k")["items"].append(3)
+    assert cache.get("k") == {"items": [1]}
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"))
+    disk.set("k", {"v": 1})
+    cache = TieredCache(TTLCache(), disk)
+
+    assert cache.get("k") == {"v": 1}
+    assert cache.get("k") == {"v": 1}
+    assert disk.stats()["hits"] == 1
+    assert cache.stats()["memory"]["hits"] == 1
+
+
+def test_disk_tier_expires_and_survives_reopening(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path, ttl=60).set("k", [1, 2])
+    assert SQLiteCache(path).get("k") == [1, 2]
+    later = time.time() + 61
+    monkeypatch.setattr(search_cache.time, "time", lambda: later)
+    assert SQLiteCache(path).get("k") is None
+
+
+def test_concurrent_callers_share_one_fetch():
+    flight = SingleFlight()
+    release, calls = threading.Event(), []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    def caller():
+        results.append(flight.do("k", fetch))
+
+    threads = [threading.Thread(target=caller) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(leader for _, leader in results) == [False] * 7 + [True]
+    assert {value for value, _ in results} == {"value"}
+
+
+def test_waiters_see_the_leaders_error():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("remote down")
+
+    errors = []
+    def caller():
+        try:
+            flight.do("k", fail)
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(5)
+    waiter = threading.Thread(target=caller)
+    waiter.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join()
+    waiter.join()
+    assert errors == ["remote down", "remote down"]
+
+
+def test_cached_call_fetches_once_per_key():
+    cache, calls = TTLCache(), []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return ["result"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cached_call(cache, "k", fetch))) for _ in range(6)]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1 and results == [["result"]] * 6
+    assert cached_call(cache, "k", fetch) == ["result"] and len(calls) == 1
@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyses import shared_data
+from analyses.shared_data import MANIFEST_ENV, SharedDatasets, check_memory, shared_array, shared_frame
+
+
+@pytest.fixture
+def shared(monkeypatch, tmp_path):
+    """A SharedDatasets whose `attach()` points this process at its manifest."""
+    with SharedDatasets() as shared:
+        def attach():
+            monkeypatch.setenv(MANIFEST_ENV, shared.write_manifest(str(tmp_path / "manifest.json")))
+            monkeypatch.setattr(shared_data, "_manifest", None)
+        shared.attach = attach
+        yield shared
+
+
+def not_built():
+    raise AssertionError("should have been attached, not built")
+
+
+def test_frames_and_arrays_attach_as_shared_views(shared):
+    frame = pd.DataFrame({
+        "name": pd.Series(["squat", None, "row"], dtype=str),
+        "level": pd.Categorical(["beginner", "advanced", None]),
+        "calories": np.array([1.5, np.nan, 3.0], dtype=np.float32),
+        "sets": [3, 4, 5],
+    })
+    shared.publish_frame("pool", frame)
+    shared.publish_array("points", np.arange(6.0).reshape(3, 2))
+    shared.attach()
+
+    attached = shared_frame("pool", not_built)
+    pd.testing.assert_series_equal(attached["name"], frame["name"])
+    assert list(attached["level"].cat.categories) == list(frame["level"].cat.categories)
+    assert attached["level"].cat.codes.equals(frame["level"].cat.codes)
+    assert attached["calories"].equals(frame["calories"]) and attached["sets"].equals(frame["sets"])
+    assert attached.dtypes.drop("level").equals(frame.dtypes.drop("level"))
+
+    blocks = [np.frombuffer(shm.buf, dtype=np.uint8) for shm in shared_data._attached.values()]
+    strings = attached["name"].array.__arrow_array__().chunk(0).buffers()[2]
+    for values in (attached["calories"].to_numpy(), np.frombuffer(strings, dtype=np.uint8)):
+        assert any(np.shares_memory(values, block) for block in blocks)
+
+    points = shared_array("points", not_built)
+    assert np.array_equal(points, np.arange(6.0).reshape(3, 2)) and not points.flags.writeable
+
+
+def test_unpublished_names_are_built():
+    assert shared_frame("missing", lambda: "built") == "built"
+    assert shared_array("missing", lambda: "built") == "built"
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+def test_shared_workers_use_less_private_memory():
+    growth = check_memory(workers=2)
+    assert growth["shared"]["uss"] < growth["local"]["uss"]
+    assert growth["shared"]["pss"] < growth["local"]["pss"]
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyses.tracker_stats import METRICS, TrackerStats, lttb
+
+
+@pytest.fixture
+def history():
+    """200 entries over ~300 days with gaps and some missing values."""
+    rng = np.random.default_rng(7)
+    dates = pd.to_datetime("2024-01-01") + pd.to_timedelta(np.sort(rng.choice(300, 200, replace=False)), unit="D")
+    frame = pd.DataFrame({"date": dates})
+    for i, m in enumerate(METRICS):
+        values = 50 + 10 * i + np.linspace(0, 5, len(dates)) + rng.normal(0, 2, len(dates))
+        values[rng.random(len(dates)) < 0.1] = np.nan
+        frame[m] = values
+    return frame
+
+
+def built_by_appending(frame, start=50):
+    stats = TrackerStats.from_frame(frame.iloc[:start])
+    for row in frame.iloc[start:].to_dict("records"):
+        stats = stats.appended(row.pop("date"), row)
+    return stats
+
+
+def test_appended_stats_match_pandas(history):
+    stats = built_by_appending(history)
+    indexed = history.set_index("date")
+    last = history["date"].iloc[-1]
+    for m in METRICS:
+        for window in (7, 30):
+            expected = indexed[m].rolling(f"{window}D").mean()
+            np.testing.assert_allclose(stats.rolling_series(m, window), expected.to_numpy())
+            assert stats.rolling_mean(m, window) == pytest.approx(expected.iloc[-1])
+
+        recent = indexed.loc[indexed.index > last - pd.Timedelta(days=30), m].dropna()
+        x = (recent.index - recent.index[0]).days.to_numpy(dtype=float)
+        assert stats.trend(m, 30) == pytest.approx(np.polyfit(x, recent.to_numpy(), 1)[0] * 7)
+
+    weekly = indexed[METRICS].resample("W-MON", label="left", closed="left").mean().dropna(how="all")
+    ours = stats.weekly().set_index("week")[METRICS]
+    pd.testing.assert_frame_equal(ours, weekly, check_freq=False, check_names=False, check_index_type=False)
+
+
+def test_appending_leaves_earlier_snapshots_unchanged(history):
+    before = TrackerStats.from_frame(history.iloc[:100])
+    summary, frame = before.summary(), before.frame()
+    built_by_appending(history, start=100)
+    assert before.summary() == summary
+    pd.testing.assert_frame_equal(before.frame(), frame)
+    assert before.appended(history["date"].iloc[50], {}) is None
+
+
+def test_lttb_keeps_the_ends_and_the_peaks():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[500] = 10
+    idx = lttb(x, y, 50)
+    assert len(idx) == 50 and idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0) and 500 in idx
+    assert np.array_equal(lttb(x[:20], y[:20], 50), np.arange(20))
@@ -0,0 +1,90 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from analyses import tracker_store
+from analyses.tracker_store import TrackerStore, UnknownMember, open_user_store, register_member
+
+
+@pytest.fixture
+def root(tmp_path):
+    return str(tmp_path / "members")
+
+
+def test_members_have_separate_stores(root):
+    register_member("ann", root)
+    register_member("bob", root)
+    ann, bob = open_user_store("ann", root), open_user_store("bob", root)
+    assert ann.path != bob.path
+
+    ann.add_entry("2024-03-01", 70.0, 300, 5000, 7.5)
+    bob.add_entry("2024-03-01", 90.0, 500, 9000, 6.0)
+    bob.add_entry("2024-03-02", 89.5, 450, 8000, 6.5)
+    assert ann.entries()["weight"].tolist() == [70.0]
+    assert bob.entries()["weight"].tolist() == [90.0, 89.5]
+
+    bob.delete_dates(["2024-03-01"])
+    assert len(ann) == 1 and len(bob) == 1
+    with pytest.raises(UnknownMember):
+        open_user_store("carol", root)
+
+
+def test_concurrent_writers_lose_nothing(tmp_path):
+    path = str(tmp_path / "progress.db")
+    TrackerStore(path)
+    days = pd.date_range("2024-01-01", periods=200)
+    results = []
+
+    def writer(offset):
+        store = TrackerStore(path)  # its own connections, as another session would have
+        results.extend(store.add_entry(day, 70.0 + offset, 300, 5000, 7.0) for day in days[offset::2])
+        # Every date is also tried by the other writer: exactly one insert wins
+        results.extend(store.add_entry(day, 0.0, 0, 0, 0) for day in days[1 - offset::2])
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(results) == len(days) == len(TrackerStore(path))
+
+
+def test_failed_write_rolls_back(tmp_path):
+    store = TrackerStore(str(tmp_path / "progress.db"))
+    with pytest.raises(RuntimeError):
+        with store._write() as conn:
+            conn.execute("INSERT INTO entries (date, weight) VALUES ('2024-01-01', 70)")
+            raise RuntimeError
+    assert len(store) == 0
+    assert store.add_entry("2024-01-01", 70.0, 300, 5000, 7.0)
+
+
+def test_stats_after_insert_match_a_rebuild(tmp_path):
+    store = TrackerStore(str(tmp_path / "progress.db"))
+    for i, day in enumerate(pd.date_range("2024-01-01", periods=40)):
+        store.add_entry(day, 80.0 - i * 0.1, 300 + i, 5000, 7.0)
+    before = store.stats()
+    assert store.add_entry("2024-02-20", 75.0, 400, 6000, 8.0)
+    after = store.stats()
+
+    assert after is not before and len(after) == len(before) + 1
+    rebuilt = TrackerStore(store.path).stats().summary()
+    for metric, values in after.summary().items():
+        assert values == pytest.approx(rebuilt[metric], nan_ok=True)
+    # An out-of-order insert falls back to a rebuild
+    assert store.add_entry("2023-12-31", 81.0, 250, 4000, 7.0)
+    columns = ["date", "weight", "calories_burned", "steps", "sleep_time"]
+    pd.testing.assert_frame_equal(store.stats().frame()[columns], store.entries()[columns], check_dtype=False)
+
+
+def test_open_stores_are_bounded(root, monkeypatch):
+    monkeypatch.setattr(tracker_store, "MAX_OPEN_STORES", 2)
+    monkeypatch.setattr(tracker_store, "_user_stores", type(tracker_store._user_stores)())
+    for user in ("a", "b", "c"):
+        register_member(user, root)
+    a = open_user_store("a", root)
+    open_user_store("b", root)
+    assert open_user_store("a", root) is a  # "b" is now the least recently used
+    open_user_store("c", root)
+    assert list(tracker_store._user_stores) == [tracker_store.user_store_path(u, root) for u in ("a", "c")]